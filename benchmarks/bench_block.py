@@ -0,0 +1,72 @@
+"""
+03 페이지 캐시 표현별 메모리와 캐시 히트 비용 비교 (오프라인)
+
+    python -m benchmarks.bench_block --sizes 10 100 1000
+
+- frames: 예전 방식. 기업별 OHLCV + Dividends + Stock Splits + Market_Cap float64 DataFrame 딕셔너리를
+  st.cache_data 에 보관 (히트마다 pickle 에서 복원)
+- trimmed: Close/Market_Cap 만 남긴 float64 DataFrame 딕셔너리를 st.cache_data 에 보관
+- block: market.block.PriceBlock (float32 한 덩어리) 을 st.cache_resource 에 보관 (히트 시 같은 객체 반환)
+"""
+import argparse
+import pickle
+import time
+
+import pandas as pd
+
+from benchmarks import fixture_yfinance
+from market.block import PriceBlock
+
+DAYS = 365 * 3
+
+
+def make_frames(n):
+    frames = {}
+    for i in range(n):
+        hist = fixture_yfinance.make_history(f"SYM{i}", days=DAYS)
+        hist["Market_Cap"] = hist["Close"] * 1e9 / 1e12
+        frames[f"Company {i}"] = hist
+    return frames
+
+
+def frames_nbytes(frames):
+    return sum(hist.memory_usage(index=True, deep=True).sum() for hist in frames.values())
+
+
+def cache_data_hit(value, repeat):
+    """st.cache_data 히트와 같은 비용: 저장해 둔 pickle 을 매번 복원"""
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        pickle.loads(payload)
+    return (time.perf_counter() - start) / repeat, len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캐시 표현별 메모리/히트 비용 비교")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10, 100, 1000], help="기업 수")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'기업 수':>7} {'표현':<8} {'메모리(MiB)':>12} {'pickle(MiB)':>12} {'히트(ms)':>10}")
+    for n in args.sizes:
+        frames = make_frames(n)
+        trimmed = {company: hist[["Close", "Market_Cap"]] for company, hist in frames.items()}
+        close = pd.concat({c: h["Close"] for c, h in trimmed.items()}, axis=1)
+        market_cap = pd.concat({c: h["Market_Cap"] for c, h in trimmed.items()}, axis=1)
+        block = PriceBlock.from_frames(Close=close, Market_Cap=market_cap)
+
+        for label, value in (("frames", frames), ("trimmed", trimmed)):
+            hit, size = cache_data_hit(value, args.repeat)
+            print(f"{n:>7} {label:<8} {frames_nbytes(value) / 2**20:>12.2f} {size / 2**20:>12.2f} {hit * 1000:>10.2f}")
+
+        # cache_resource 는 저장한 객체를 그대로 돌려주므로 히트 비용은 복사 없는 뷰를 만드는 정도
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            block.frame("Market_Cap")
+        hit = (time.perf_counter() - start) / args.repeat
+        print(f"{n:>7} {'block':<8} {block.nbytes / 2**20:>12.2f} {'-':>12} {hit * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+메인 차트 다운샘플링 전후의 figure JSON 크기와 직렬화 시간 비교 (오프라인)
+
+    python -m benchmarks.bench_downsample
+
+3년 일봉 10개 기업과, 같은 기간의 1분봉 수준(약 10만 점) 데이터를 비교합니다.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from benchmarks import fixture_yfinance
+from market.downsample import auto_points, downsample
+
+SYMBOLS = ['AAPL', 'NVDA', 'MSFT', 'GOOGL', 'AMZN', 'META', 'TSLA', 'BRK-A', 'TSM', 'AVGO']
+
+
+def intraday(symbol, n=100_000):
+    """분봉 규모의 합성 시계열"""
+    rng = np.random.default_rng(abs(hash(symbol)) % 2**32)
+    index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=n, freq="min")
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.001, n))), index=index)
+
+
+def build(series_by_symbol, n_points=None):
+    fig = go.Figure()
+    for symbol, series in series_by_symbol.items():
+        if n_points:
+            series = downsample(series, n_points)
+        fig.add_trace(go.Scatter(x=series.index, y=series.values, mode='lines+markers', name=symbol))
+    return fig
+
+
+def measure(label, series_by_symbol, n_points=None, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = build(series_by_symbol, n_points).to_json()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<24} {len(payload) / 1024:>10.1f} KiB {best * 1000:>10.1f} ms")
+
+
+def main():
+    daily = {s: fixture_yfinance.make_history(s)['Close'] for s in SYMBOLS}
+    minute = {s: intraday(s) for s in SYMBOLS}
+    n_points = auto_points()
+
+    print(f"{'':<24} {'JSON 크기':>14} {'생성+직렬화':>13}  (trace 당 {n_points}점)")
+    measure("일봉 3년 - 원본", daily)
+    measure("일봉 3년 - LTTB", daily, n_points)
+    measure("분봉 10만 - 원본", minute, repeat=1)
+    measure("분봉 10만 - LTTB", minute, n_points)
+
+
+if __name__ == "__main__":
+    main()
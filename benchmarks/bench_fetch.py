@@ -0,0 +1,70 @@
+"""
+load_all_data 수집 방식 비교 벤치마크 (오프라인)
+
+    python -m benchmarks.bench_fetch --latency 0.3 --sessions 20
+
+순차 호출과 market.fetch.fetch_many 의 wall-clock 시간을 비교하고,
+여러 세션이 같은 종목을 동시에 요청할 때 실제로 나간 요청 수(market.gateway 의 요청 합치기)를 셉니다.
+--rate 를 주지 않으면 비교가 속도 제한에 묻히지 않도록 관문의 초당 요청 제한을 끕니다.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import fixture_yfinance
+
+SYMBOLS = ['AAPL', 'NVDA', 'MSFT', 'GOOGL', 'AMZN', 'META', 'TSLA', 'BRK-A', 'TSM', 'AVGO']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.3, help="요청 1건당 지연(초)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="요청 실패 확률 (일시적 오류로 재시도됨)")
+    parser.add_argument("--rate", type=float, default=None, help="관문의 초당 요청 제한 (기본: 제한 없음)")
+    parser.add_argument("--sessions", type=int, default=20, help="같은 종목을 동시에 요청하는 세션 수")
+    args = parser.parse_args()
+
+    fixture_yfinance.install(latency=args.latency, failure_rate=args.failure_rate)
+    import instrumentation
+    from market.fetch import fetch_fundamentals, fetch_many, fetch_stock, run_many
+    from market.gateway import GATEWAY, TokenBucket
+
+    if args.rate is None:
+        GATEWAY.bucket = TokenBucket(rate=1e9, capacity=1e9)
+    else:
+        GATEWAY.bucket = TokenBucket(rate=args.rate)
+
+    start = time.perf_counter()
+    for symbol in SYMBOLS:
+        fetch_stock(symbol)
+        fetch_fundamentals(symbol)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = list(fetch_many(SYMBOLS)) + list(run_many(fetch_fundamentals, SYMBOLS))
+    concurrent = time.perf_counter() - start
+
+    assert all(error is None for *_, error in results)
+    print(f"종목 수: {len(SYMBOLS)}, 요청당 지연: {args.latency:.2f}s")
+    print(f"순차 수집: {sequential:.2f}s")
+    print(f"동시 수집: {concurrent:.2f}s ({sequential / concurrent:.1f}배)")
+
+    # 캐시가 동시에 만료된 세션들이 같은 종목을 한꺼번에 요청하는 상황
+    instrumentation.reset()
+    upstream_before = fixture_yfinance.calls
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        sessions = [pool.submit(lambda: list(fetch_many(SYMBOLS))) for _ in range(args.sessions)]
+        failed = sum(error is not None for session in sessions for *_, error in session.result())
+    elapsed = time.perf_counter() - start
+    counters = instrumentation.snapshot()["counters"]
+    print(
+        f"동시 세션 {args.sessions}개: {elapsed:.2f}s, 호출 {counters.get('gateway:calls', 0)}회 -> "
+        f"실제 요청 {fixture_yfinance.calls - upstream_before}회 "
+        f"(합침 {counters.get('gateway:coalesced', 0)}, 재시도 {counters.get('gateway:retried', 0)}, "
+        f"실패 {counters.get('gateway:failed', 0)}, 세션에 보인 오류 {failed})"
+    )
+
+
+if __name__ == "__main__":
+    main()
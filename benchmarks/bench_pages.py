@@ -0,0 +1,160 @@
+"""
+페이지별 오프라인 벤치마크 (Streamlit AppTest + yfinance 대역)
+
+    python -m benchmarks.bench_pages --latency 0.05 --failure-rate 0.02 --output bench.json
+
+각 페이지마다 빈 저장소/빈 캐시에서 처음 실행(cold)한 시간, 같은 세션에서 다시 실행(warm)한 시간,
+cold 실행 중 최대 메모리(tracemalloc), figure JSON 크기를 측정해 JSON 파일로 저장합니다.
+
+market.store 는 저장소 경로를 import 시점에 정하므로, 페이지마다 새 저장소 경로를 환경 변수로 준
+별도 프로세스에서 측정합니다. --rate 를 주지 않으면 cold 시간이 속도 제한 대기에 묻히지 않도록
+관문의 초당 요청 제한을 끕니다.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(ROOT, ".cache", "bench", "pages.json")
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def clear_caches():
+    import streamlit as st
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def bench_page(path, warm_runs, timeout):
+    """페이지 하나를 cold 1회, warm warm_runs 회 실행하고 측정값을 돌려줌 (run_child 가 띄운 프로세스에서 실행)"""
+    import instrumentation
+    from benchmarks import fixture_yfinance
+    from streamlit.testing.v1 import AppTest
+
+    clear_caches()
+    instrumentation.reset()
+
+    at = AppTest.from_file(path, default_timeout=timeout)
+    tracemalloc.start()
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    warm = []
+    for _ in range(warm_runs):
+        start = time.perf_counter()
+        at.run()
+        warm.append(time.perf_counter() - start)
+
+    metrics = instrumentation.snapshot()
+    # 페이지가 띄운 백그라운드 갱신 스레드를 멈춘 뒤 결과를 돌려줌
+    from market.refresher import stop_shared
+
+    stop_shared()
+    return {
+        "page": os.path.relpath(path, ROOT),
+        "cold_s": cold,
+        "warm_s": sorted(warm)[len(warm) // 2] if warm else None,
+        "peak_memory_mb": peak / 2**20,
+        "payload_bytes": {name: row["last"] for name, row in metrics["payloads"].items()},
+        "cache": {name: {"hits": row["hits"], "misses": row.get("misses", 0)} for name, row in metrics["caches"].items()},
+        "exceptions": [str(e.value) for e in at.exception],
+        "errors": [str(e.value) for e in at.error],
+        "upstream_requests": fixture_yfinance.calls,
+    }
+
+
+def run_child(page, store_path, args):
+    """새 프로세스에서 빈 저장소로 페이지 하나를 측정"""
+    command = [
+        sys.executable, "-m", "benchmarks.bench_pages", "--child",
+        "--latency", str(args.latency), "--failure-rate", str(args.failure_rate),
+        "--warm-runs", str(args.warm_runs), "--timeout", str(args.timeout),
+        *(["--rate", str(args.rate)] if args.rate is not None else []),
+        *(["--fixture-dir", args.fixture_dir] if args.fixture_dir else []),
+        page,
+    ]
+    # 저장소 경로는 market.store 를 import 하기 전에 정해져야 함
+    env = {**os.environ, "MARKET_STORE_PATH": store_path, "APP_DEBUG": "1"}
+    out = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="페이지별 오프라인 벤치마크")
+    parser.add_argument("--latency", type=float, default=0.05, help="yfinance 요청 1건당 지연(초)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="yfinance 요청 실패 확률")
+    parser.add_argument("--fixture-dir", default=None, help="녹화된 yfinance 응답 폴더")
+    parser.add_argument("--rate", type=float, default=None, help="관문의 초당 요청 제한 (기본: 제한 없음)")
+    parser.add_argument("--warm-runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("pages", nargs="*", help="측정할 페이지 (기본: main.py 와 pages/*.py 전체)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        from benchmarks import fixture_yfinance
+
+        fixture_yfinance.install(latency=args.latency, failure_rate=args.failure_rate, fixture_dir=args.fixture_dir)
+        sys.path.insert(0, ROOT)
+        from market.gateway import GATEWAY, TokenBucket
+
+        GATEWAY.bucket = TokenBucket(rate=1e9, capacity=1e9) if args.rate is None else TokenBucket(rate=args.rate)
+        print(json.dumps(bench_page(args.pages[0], args.warm_runs, args.timeout)))
+        return
+
+    pages = args.pages or [os.path.join(ROOT, "main.py"), *sorted(glob.glob(os.path.join(ROOT, "pages", "*.py")))]
+    print(f"관문 초당 요청 제한: {args.rate or '없음'}, 요청당 지연: {args.latency:.2f}s")
+    results = []
+    with tempfile.TemporaryDirectory() as store_dir:
+        for page in map(os.path.abspath, pages):
+            # 페이지마다 새 저장소 파일을 써서 cold 실행이 실제 수집까지 포함하게 함
+            result = run_child(page, os.path.join(store_dir, f"{os.path.basename(page)}.sqlite"), args)
+            results.append(result)
+            print(
+                f"{result['page']:<32} cold {result['cold_s']:6.2f}s  warm {result['warm_s'] or 0:6.3f}s  "
+                f"peak {result['peak_memory_mb']:7.1f}MiB  payload {sum(result['payload_bytes'].values()) / 1024:8.1f}KiB  "
+                f"upstream {result['upstream_requests']:4d}"
+            )
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "settings": {
+            "latency": args.latency,
+            "failure_rate": args.failure_rate,
+            "fixture_dir": args.fixture_dir,
+            "warm_runs": args.warm_runs,
+            "rate_limit": args.rate,
+        },
+        "upstream_requests": sum(result["upstream_requests"] for result in results),
+        "pages": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+페이지별 콜드 스타트 측정 (새 파이썬 프로세스에서 첫 요청까지)
+
+    python -m benchmarks.bench_startup --repeat 3
+
+각 페이지마다 새 프로세스를 띄워 streamlit import 시간, 첫 실행(AppTest) 시간,
+첫 실행 직후 import 되어 있는 무거운 모듈 목록을 측정합니다 (이때 미리 불러오기는 끔).
+--prewarm 을 주면 main.py 를 먼저 띄워 백그라운드 미리 불러오기가 끝난 뒤의 첫 실행 시간도 잽니다.
+yfinance 는 benchmarks.fixture_yfinance 대역을 쓰므로 네트워크가 필요 없습니다.
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(ROOT, ".cache", "bench", "startup.json")
+
+# 측정할 때 로드 여부를 확인할 무거운 모듈
+HEAVY_MODULES = ("numpy", "pandas", "plotly.graph_objects", "plotly.express", "yfinance", "folium", "streamlit_folium")
+
+# 자식 프로세스에서 실행할 코드: 결과를 JSON 한 줄로 출력
+CHILD = r"""
+import json, os, sys, time, types
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+
+
+class LazyYfinance(types.ModuleType):
+    # 대역 모듈 자체가 numpy/pandas 를 import 하므로 페이지가 yfinance 를 실제로 쓸 때 설치
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        from benchmarks import fixture_yfinance
+        if sys.modules.get("yfinance") is self:
+            fixture_yfinance.install(latency=0)
+        return getattr(fixture_yfinance, name)
+
+
+sys.modules["yfinance"] = LazyYfinance("yfinance")
+import streamlit
+from streamlit.testing.v1 import AppTest
+import_s = time.perf_counter() - start
+
+prewarm_s = None
+if {prewarm!r}:
+    import prewarm
+    AppTest.from_file({main!r}, default_timeout=300).run()
+    t = time.perf_counter()
+    prewarm.wait()
+    prewarm_s = time.perf_counter() - t
+
+t = time.perf_counter()
+at = AppTest.from_file({page!r}, default_timeout=300)
+at.run()
+first_run_s = time.perf_counter() - t
+used_yfinance = "benchmarks.fixture_yfinance" in sys.modules
+print(json.dumps({{
+    "import_streamlit_s": import_s,
+    "prewarm_wait_s": prewarm_s,
+    "first_run_s": first_run_s,
+    "loaded": [m for m in {heavy!r} if m in sys.modules and (m != "yfinance" or used_yfinance)],
+    "exceptions": [str(e.value) for e in at.exception],
+}}))
+"""
+
+
+def run_child(page, prewarm, store_path):
+    code = CHILD.format(
+        root=ROOT, page=page, main=os.path.join(ROOT, "main.py"), prewarm=prewarm, heavy=HEAVY_MODULES
+    )
+    # 미리 불러오기 없이 측정할 때는 꺼 두어야 페이지가 직접 불러온 모듈만 남음
+    env = {**os.environ, "MARKET_STORE_PATH": store_path, "APP_PREWARM": "1" if prewarm else "0"}
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="페이지별 콜드 스타트 측정")
+    parser.add_argument("--repeat", type=int, default=3, help="페이지마다 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--prewarm", action="store_true", help="main.py 의 미리 불러오기가 끝난 뒤 첫 실행도 측정")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("pages", nargs="*", help="측정할 페이지 (기본: main.py 와 pages/*.py 전체)")
+    args = parser.parse_args()
+
+    pages = args.pages or [os.path.join(ROOT, "main.py"), *sorted(glob.glob(os.path.join(ROOT, "pages", "*.py")))]
+    scenarios = [False, True] if args.prewarm else [False]
+    results = []
+    with tempfile.TemporaryDirectory() as store_dir:
+        for page in map(os.path.abspath, pages):
+            for prewarm in scenarios:
+                runs = []
+                for i in range(args.repeat):
+                    # 저장소는 페이지마다 한 번 채운 뒤 재사용해 수집 시간이 아닌 시작 비용만 비교
+                    store_path = os.path.join(store_dir, f"{os.path.basename(page)}.sqlite")
+                    runs.append(run_child(page, prewarm, store_path))
+                runs.sort(key=lambda r: r["first_run_s"])
+                result = {"page": os.path.relpath(page, ROOT), "prewarm": prewarm, **runs[len(runs) // 2]}
+                results.append(result)
+                print(
+                    f"{result['page']:<32} {'prewarm' if prewarm else 'cold   '}  "
+                    f"import {result['import_streamlit_s']:5.2f}s  first run {result['first_run_s']:5.2f}s  "
+                    f"loaded: {', '.join(result['loaded']) or '-'}"
+                )
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"repeat": args.repeat, "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
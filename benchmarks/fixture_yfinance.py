@@ -0,0 +1,218 @@
+"""
+오프라인 벤치마크용 yfinance 대역(stand-in)
+
+FIXTURE_DIR 에 녹화된 데이터(<종목>.csv 일봉, <종목>.json info)가 있으면 그것을 재생하고,
+없으면 종목마다 항상 같은 값이 나오는 합성 데이터를 돌려줍니다.
+요청마다 인위적인 지연과 일정 비율의 실패를 넣을 수 있습니다.
+
+install() 을 호출하면 sys.modules['yfinance'] 를 이 모듈로 바꿔치기하므로
+페이지나 market 모듈을 import 하기 전에 호출해야 합니다.
+
+실제 Yahoo 데이터 녹화:
+    python -m benchmarks.fixture_yfinance record AAPL MSFT --out benchmarks/fixtures
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+LATENCY = 0.0  # 요청 1건당 지연 시간(초)
+FAILURE_RATE = 0.0  # 요청이 실패할 확률 (0~1)
+
+_rng = random.Random(0)
+_rng_lock = threading.Lock()
+calls = 0  # 지금까지 받은 요청 수
+# 합성 환율 기준값: 1 단위 통화의 USD 가격 ('<통화>USD=X' 티커)
+FX_RATES = {"SAR": 0.2667, "KRW": 0.00073, "JPY": 0.0067, "GBP": 1.27, "EUR": 1.08,
+            "TWD": 0.031, "HKD": 0.128, "CHF": 1.12, "CAD": 0.74}
+
+
+def _seed(symbol):
+    return zlib.crc32(symbol.encode())
+
+
+def _request():
+    """요청 1건을 흉내: 지연을 주고 FAILURE_RATE 확률로 실패"""
+    global calls
+    with _rng_lock:
+        calls += 1
+        failed = _rng.random() < FAILURE_RATE
+    if LATENCY:
+        time.sleep(LATENCY)
+    if failed:
+        raise ConnectionError("fixture: injected upstream failure")
+
+
+@lru_cache(maxsize=None)
+def _recorded_history(symbol):
+    path = os.path.join(FIXTURE_DIR, f"{symbol}.csv")
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, index_col="Date", parse_dates=["Date"])
+
+
+@lru_cache(maxsize=None)
+def _recorded_info(symbol):
+    path = os.path.join(FIXTURE_DIR, f"{symbol}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _period_days(period):
+    for unit, days in (("mo", 30), ("y", 365), ("d", 1)):
+        if period.endswith(unit):
+            return int(period[:-len(unit)]) * days
+    return 365
+
+
+def make_history(symbol, days=365 * 3, end=None):
+    """녹화된 일봉이 있으면 그것을, 없으면 종목마다 항상 같은 값이 나오는 합성 일봉 데이터"""
+    recorded = _recorded_history(symbol)
+    if recorded is not None:
+        return recorded[recorded.index >= recorded.index[-1] - pd.Timedelta(days=days)].copy()
+
+    from market.currency import DEFAULT_WEEKMASK, WEEKMASKS, is_fx, listing
+
+    end = pd.Timestamp(end or pd.Timestamp.today()).normalize()
+    # 거래소 달력의 거래 요일을 따름 (예: .SR 은 일~목)
+    weekmask = WEEKMASKS.get(listing(symbol)[1], DEFAULT_WEEKMASK)
+    index = pd.bdate_range(end=end, periods=int(days * 252 / 365), freq="C", weekmask=weekmask, name="Date")
+    rng = np.random.default_rng(_seed(symbol))
+    if is_fx(symbol):
+        # 환율은 기준값 주변에서 작게 움직임
+        returns = rng.normal(0.0, 0.003, len(index))
+        close = FX_RATES.get(symbol[:3], 1.0) * np.exp(np.cumsum(returns) - np.cumsum(returns).mean())
+    else:
+        returns = rng.normal(0.0005, 0.02, len(index))
+        close = 100 * np.exp(np.cumsum(returns))
+    return pd.DataFrame({
+        "Open": close * 0.995,
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 50_000_000, len(index)),
+        "Dividends": 0.0,
+        "Stock Splits": 0.0,
+    }, index=index)
+
+
+def make_info(symbol):
+    recorded = _recorded_info(symbol)
+    if recorded is not None:
+        return dict(recorded)
+
+    from market.currency import listing
+
+    rng = np.random.default_rng(_seed(symbol) + 1)
+    return {
+        "symbol": symbol,
+        "currency": listing(symbol)[0],
+        "sharesOutstanding": int(rng.integers(1, 20) * 1e9),
+    }
+
+
+class Ticker:
+    def __init__(self, symbol):
+        self.ticker = symbol
+
+    def get_history(self, period="1mo", start=None, **kwargs):
+        _request()
+        if start is not None:
+            hist = make_history(self.ticker)
+            return hist[hist.index >= pd.Timestamp(start)]
+        return make_history(self.ticker, days=_period_days(period))
+
+    history = get_history
+
+    def get_info(self):
+        _request()
+        return make_info(self.ticker)
+
+    def get_shares_full(self, start=None, end=None):
+        """분기마다 조금씩 줄어드는(자사주 매입) 발행주식수 이력"""
+        _request()
+        current = make_info(self.ticker)["sharesOutstanding"]
+        index = pd.date_range(start=start or "2021-01-01", end=end or pd.Timestamp.today(), freq="QS")
+        decay = np.linspace(0.05, 0.0, len(index))
+        return pd.Series(current * (1 + decay), index=index.tz_localize("America/New_York"))
+
+    @property
+    def info(self):
+        return self.get_info()
+
+
+def download(tickers, start=None, end=None, interval="1d", auto_adjust=True, progress=True, **kwargs):
+    """
+    yf.download 흉내. 최신 yfinance 처럼 (Price, Ticker) MultiIndex 열을 돌려주며
+    auto_adjust=True(기본값) 이면 'Adj Close' 열이 없습니다.
+    """
+    _request()
+    if isinstance(tickers, str):
+        tickers = tickers.replace(",", " ").split()
+    frames = {}
+    for symbol in tickers:
+        hist = make_history(symbol, end=end).drop(columns=["Dividends", "Stock Splits"])
+        if start is not None:
+            hist = hist[hist.index >= pd.Timestamp(start)]
+        if not auto_adjust:
+            hist["Adj Close"] = hist["Close"]
+        if interval == "1mo":
+            hist = hist.resample("MS").agg({
+                "Open": "first", "High": "max", "Low": "min", "Close": "last",
+                "Volume": "sum", **({"Adj Close": "last"} if not auto_adjust else {}),
+            })
+        frames[symbol] = hist
+    data = pd.concat(frames, axis=1, names=["Ticker", "Price"]).swaplevel(axis=1)
+    return data.sort_index(axis=1, level=0, sort_remaining=False)
+
+
+def install(latency=0.0, failure_rate=0.0, fixture_dir=None, seed=0):
+    """현재 프로세스의 yfinance 를 이 대역으로 바꿉니다"""
+    global LATENCY, FAILURE_RATE, FIXTURE_DIR, calls
+    LATENCY = latency
+    FAILURE_RATE = failure_rate
+    if fixture_dir is not None:
+        FIXTURE_DIR = fixture_dir
+        _recorded_history.cache_clear()
+        _recorded_info.cache_clear()
+    _rng.seed(seed)
+    calls = 0
+    sys.modules["yfinance"] = sys.modules[__name__]
+
+
+def record(symbols, out_dir=FIXTURE_DIR, period="3y"):
+    """실제 yfinance 에서 일봉과 info 를 받아 재생용 파일로 저장"""
+    import yfinance
+
+    os.makedirs(out_dir, exist_ok=True)
+    for symbol in symbols:
+        stock = yfinance.Ticker(symbol)
+        hist = stock.get_history(period=period)
+        hist.index = hist.index.tz_localize(None)
+        hist.index.name = "Date"
+        hist.to_csv(os.path.join(out_dir, f"{symbol}.csv"))
+        with open(os.path.join(out_dir, f"{symbol}.json"), "w", encoding="utf-8") as f:
+            json.dump(stock.get_info(), f, ensure_ascii=False, default=str)
+        print(f"녹화 완료: {symbol} ({len(hist)}행)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="yfinance 응답 녹화")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record")
+    rec.add_argument("symbols", nargs="+")
+    rec.add_argument("--out", default=FIXTURE_DIR)
+    rec.add_argument("--period", default="3y")
+    args = parser.parse_args()
+    record(args.symbols, args.out, args.period)
@@ -0,0 +1,334 @@
+"""
+동시 접속 부하 테스트 (Streamlit AppTest 세션 여러 개 + yfinance 대역)
+
+    python -m benchmarks.load_test --users 8 --duration 60
+    python -m benchmarks.load_test --users 16 --cold main.py pages/03_시총_claude.py
+
+한 프로세스(= 레플리카 하나) 안에서 가상 사용자 스레드가 각자 페이지를 새 세션으로 열고,
+위젯(라디오, 선택 상자, 멀티셀렉트, 숫자 입력, 체크박스)을 무작위로 바꿔 가며 다시 실행합니다.
+캐시와 저장소는 실제 서버처럼 모든 세션이 함께 쓰므로 캐시 몰림(stampede)과
+Plotly 직렬화로 CPU 가 포화되는 지점을 사용자 수를 바꿔 가며 확인할 수 있습니다.
+
+페이지별 지연 시간 백분위수(열기/조작), 처리량, 메모리(RSS) 증가, 캐시 적중률을 JSON 으로 저장합니다.
+기본으로는 페이지마다 한 번씩 미리 실행해 저장소를 채운 뒤 측정하고, --cold 면 빈 저장소에서 바로 시작합니다.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(ROOT, ".cache", "bench", "load.json")
+DEFAULT_PAGES = ["main.py", "pages/01_지도.py", "pages/03_시총_claude.py"]
+PERCENTILES = (50, 90, 95, 99)
+# 페이지 소스에서 instrumentation.cache 로 감싼 함수 이름을 찾아 페이지별 캐시 적중률을 묶음
+CACHED_FN = re.compile(r"@instrumentation\.cache\(.*\)\s*\ndef (\w+)")
+
+
+def rss_mb():
+    """현재 프로세스의 RSS (MiB, /proc 가 없으면 최대 RSS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+class MemorySampler(threading.Thread):
+    """interval 초마다 RSS 를 기록하는 스레드"""
+
+    def __init__(self, interval=0.5):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            self.samples.append(rss_mb())
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.samples.append(rss_mb())
+
+
+def _round_trips(widget):
+    """표시 문자열 그대로 다시 넣어도 같은 항목이 선택되는 옵션만 (format_func 가 있는 위젯 대비)"""
+    try:
+        format_func = widget.format_func
+    except (KeyError, AttributeError):
+        return []
+    return [option for option in widget.options if str(format_func(option)) == option]
+
+
+def interact(at, rng):
+    """화면의 위젯 하나를 무작위로 골라 값을 바꿈 (바꿀 위젯이 없으면 None, 있으면 위젯 설명)"""
+    candidates = []
+    for widget in [*at.radio, *at.selectbox]:
+        options = [option for option in _round_trips(widget) if option != str(widget.format_func(widget.value))]
+        if options:
+            candidates.append((widget, lambda w=widget, o=options: w.set_value(rng.choice(o))))
+    for widget in at.multiselect:
+        options = _round_trips(widget)
+        if options:
+            def toggle(w=widget, o=options):
+                option = rng.choice(o)
+                return w.unselect(option) if option in w.value else w.select(option)
+            candidates.append((widget, toggle))
+    for widget in at.number_input:
+        proto = widget.proto
+        up = not (proto.has_max and widget.value >= proto.max)
+        down = not (proto.has_min and widget.value <= proto.min)
+        if not (up or down):
+            continue
+        candidates.append((widget, widget.increment if up and (not down or rng.random() < 0.5) else widget.decrement))
+    for widget in [*at.checkbox, *at.toggle]:
+        candidates.append((widget, lambda w=widget: w.set_value(not w.value)))
+    if not candidates:
+        return None
+    widget, action = rng.choice(candidates)
+    action()
+    return f"{widget.type}:{widget.label}"
+
+
+class Recorder:
+    """가상 사용자 스레드들이 함께 쓰는 측정 기록"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)  # (페이지, 'open'|'interact') -> [초]
+        self.errors = defaultdict(list)  # 페이지 -> [메시지]
+        self._lock = threading.Lock()
+
+    def add(self, page, kind, elapsed, at=None, error=None):
+        with self._lock:
+            self.latencies[(page, kind)].append(elapsed)
+            messages = [str(e.value) for e in at.exception] if at is not None else []
+            if error is not None:
+                messages.append(f"{type(error).__name__}: {error}")
+            self.errors[page].extend(messages)
+
+
+def allow_concurrent_apptests():
+    """
+    AppTest 는 한 번에 세션 하나만 실행한다고 가정하므로 여러 스레드에서 돌릴 수 있게 두 가지를 보완합니다.
+    - 실행이 끝날 때 전역 Runtime 을 None 으로 되돌려 아직 실행 중인 다른 세션이 실패하므로
+      그 사이에는 마지막으로 만든 가짜 Runtime 을 계속 돌려줌
+    - Python 3.11 의 ast.parse 는 여러 스레드에서 동시에 부르면 간혹 SystemError 가 나므로
+      (AST constructor recursion depth mismatch) 스크립트 컴파일만 순서대로 실행
+    """
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.runtime.scriptrunner import magic
+
+    original_instance = Runtime.instance.__func__
+    last = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+            return cls._instance
+        return last[0] if last else original_instance(cls)
+
+    Runtime.instance = classmethod(instance)
+
+    add_magic = magic.add_magic
+    lock = threading.Lock()
+
+    def locked_add_magic(*args, **kwargs):
+        with lock:
+            return add_magic(*args, **kwargs)
+
+    magic.add_magic = locked_add_magic
+
+
+def run_user(user, pages, recorder, deadline, interactions, timeout, seed):
+    """가상 사용자 한 명: 마감 시각까지 페이지를 새 세션으로 열고 위젯을 interactions 번 조작"""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + user)
+    while time.monotonic() < deadline:
+        page = rng.choice(pages)
+        at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=timeout)
+        start = time.perf_counter()
+        try:
+            at.run()
+        except Exception as e:  # 시간 초과 등도 기록하고 계속 진행
+            recorder.add(page, "open", time.perf_counter() - start, error=e)
+            continue
+        recorder.add(page, "open", time.perf_counter() - start, at)
+
+        for _ in range(interactions):
+            if time.monotonic() >= deadline or at.exception or interact(at, rng) is None:
+                break
+            start = time.perf_counter()
+            try:
+                at.run()
+            except Exception as e:
+                recorder.add(page, "interact", time.perf_counter() - start, error=e)
+                break
+            recorder.add(page, "interact", time.perf_counter() - start, at)
+
+
+def summarize(values):
+    if not values:
+        return None
+    return {
+        "count": len(values),
+        "mean_s": float(np.mean(values)),
+        **{f"p{p}_s": float(np.percentile(values, p)) for p in PERCENTILES},
+        "max_s": float(np.max(values)),
+    }
+
+
+def cache_ratios(page, caches):
+    """페이지 소스에 선언된 캐시 함수들의 호출/적중 수와 적중률"""
+    with open(os.path.join(ROOT, page), encoding="utf-8") as f:
+        names = CACHED_FN.findall(f.read())
+    result = {}
+    for name in names:
+        row = caches.get(name)
+        if row and row.get("calls"):
+            result[name] = {"calls": row["calls"], "hits": row["hits"], "hit_ratio": row["hits"] / row["calls"]}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 접속 부하 테스트")
+    parser.add_argument("pages", nargs="*", help=f"대상 페이지 (기본: {' '.join(DEFAULT_PAGES)})")
+    parser.add_argument("--users", type=int, default=8, help="동시 가상 사용자 수")
+    parser.add_argument("--duration", type=float, default=60, help="측정 시간(초)")
+    parser.add_argument("--interactions", type=int, default=5, help="페이지를 연 뒤 위젯을 바꾸는 횟수")
+    parser.add_argument("--latency", type=float, default=0.05, help="yfinance 요청 1건당 지연(초)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="yfinance 요청 실패 확률")
+    parser.add_argument("--fixture-dir", default=None, help="녹화된 yfinance 응답 폴더")
+    parser.add_argument("--cold", action="store_true", help="미리 실행하지 않고 빈 저장소에서 바로 시작")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    pages = [os.path.relpath(os.path.abspath(page), ROOT) for page in args.pages] or DEFAULT_PAGES
+    with tempfile.TemporaryDirectory(prefix="load-test-") as store_dir:
+        # 저장소/데이터셋 경로는 모듈을 import 할 때 정해지므로 페이지를 불러오기 전에 지정
+        os.environ["MARKET_STORE_PATH"] = os.path.join(store_dir, "market.sqlite")
+        os.environ["MARKET_DATASET_DIR"] = os.path.join(store_dir, "datasets")
+        os.environ["APP_DEBUG"] = "1"  # 차트 payload 크기도 기록
+        try:
+            run_load_test(args, pages)
+        finally:
+            # 임시 폴더를 지우기 전에 저장소를 쓰는 백그라운드 갱신 스레드를 멈춤
+            from market.refresher import stop_shared
+
+            stop_shared()
+
+
+def run_load_test(args, pages):
+    """가상 사용자들로 pages 를 args.duration 초 동안 돌리고 결과를 args.output 에 저장"""
+    from benchmarks import fixture_yfinance
+    from benchmarks.bench_pages import clear_caches, git_revision
+
+    fixture_yfinance.install(latency=args.latency, failure_rate=args.failure_rate, fixture_dir=args.fixture_dir)
+    sys.path.insert(0, ROOT)
+    import instrumentation
+    from streamlit.testing.v1 import AppTest
+
+    allow_concurrent_apptests()
+    clear_caches()
+    if not args.cold:
+        for page in pages:
+            AppTest.from_file(os.path.join(ROOT, page), default_timeout=args.timeout).run()
+    instrumentation.reset()
+    upstream_before = fixture_yfinance.calls
+
+    recorder = Recorder()
+    sampler = MemorySampler()
+    sampler.start()
+    started = time.monotonic()
+    deadline = started + args.duration
+    users = [
+        threading.Thread(
+            target=run_user, name=f"user-{i}",
+            args=(i, pages, recorder, deadline, args.interactions, args.timeout, args.seed),
+        )
+        for i in range(args.users)
+    ]
+    for thread in users:
+        thread.start()
+    for thread in users:
+        thread.join()
+    elapsed = time.monotonic() - started
+    sampler.stop()
+
+    metrics = instrumentation.snapshot()
+    results = []
+    for page in pages:
+        opened = recorder.latencies[(page, "open")]
+        interacted = recorder.latencies[(page, "interact")]
+        results.append({
+            "page": page,
+            "open": summarize(opened),
+            "interact": summarize(interacted),
+            "throughput_rps": (len(opened) + len(interacted)) / elapsed,
+            "caches": cache_ratios(page, metrics["caches"]),
+            "errors": len(recorder.errors[page]),
+            "error_samples": sorted(set(recorder.errors[page]))[:5],
+        })
+        row = results[-1]
+        print(
+            f"{page:<28} 열기 p50 {(row['open'] or {}).get('p50_s', 0):6.2f}s p95 {(row['open'] or {}).get('p95_s', 0):6.2f}s  "
+            f"조작 p50 {(row['interact'] or {}).get('p50_s', 0):6.2f}s p95 {(row['interact'] or {}).get('p95_s', 0):6.2f}s  "
+            f"{row['throughput_rps']:5.2f} 회/s  오류 {row['errors']}"
+        )
+
+    runs = sum(len(values) for values in recorder.latencies.values())
+    memory = {
+        "start_mb": sampler.samples[0],
+        "peak_mb": max(sampler.samples),
+        "end_mb": sampler.samples[-1],
+        "growth_mb": sampler.samples[-1] - sampler.samples[0],
+    }
+    print(f"전체 {runs}회 / {elapsed:.1f}s = {runs / elapsed:.2f} 회/s, "
+          f"RSS {memory['start_mb']:.0f} -> {memory['end_mb']:.0f} MiB (최대 {memory['peak_mb']:.0f})")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "users": args.users,
+            "duration": args.duration,
+            "interactions": args.interactions,
+            "latency": args.latency,
+            "failure_rate": args.failure_rate,
+            "fixture_dir": args.fixture_dir,
+            "cold": args.cold,
+            "seed": args.seed,
+        },
+        "elapsed_s": elapsed,
+        "throughput_rps": runs / elapsed,
+        "memory": memory,
+        "upstream_requests": fixture_yfinance.calls - upstream_before,
+        "counters": metrics["counters"],
+        "pages": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+모든 페이지가 함께 쓰는 성능 계측 모듈
+
+- span(name): 이름 붙인 구간의 소요 시간 측정
+- cache(st.cache_data(...)): 캐시 함수의 호출/미스 횟수 집계
+- record_payload(name, nbytes) / plotly_chart(fig, name): 화면으로 보내는 데이터 크기 기록
+- count(name): 이름 붙인 사건 횟수 (예: 재시도한 요청 수)
+- debug_panel(): ?debug=1 로 접속하거나 APP_DEBUG=1 일 때 사이드바에 계측 결과 표시
+
+값은 프로세스 단위로 모이므로 여러 세션의 요청이 함께 집계됩니다.
+streamlit 은 화면 관련 함수 안에서만 import 하므로 market 모듈에서도 가볍게 쓸 수 있습니다.
+export_json / export_prometheus 로 로컬 파일에 내보낼 수 있습니다.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+EXPORT_DIR = os.environ.get(
+    "APP_METRICS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "metrics"),
+)
+
+_lock = threading.Lock()
+_spans = {}  # 이름 -> {count, total, max}
+_caches = {}  # 이름 -> {calls, misses}
+_payloads = {}  # 이름 -> {count, total, last}
+_counters = {}  # 이름 -> 횟수
+_started_at = time.time()
+
+
+def _add(table, name, **values):
+    with _lock:
+        row = table.setdefault(name, {})
+        for key, value in values.items():
+            if key == "max":
+                row[key] = max(row.get(key, 0), value)
+            elif key == "last":
+                row[key] = value
+            else:
+                row[key] = row.get(key, 0) + value
+
+
+@contextmanager
+def span(name):
+    """with span("이름"): 블록의 실행 시간을 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _add(_spans, name, count=1, total=elapsed, max=elapsed)
+
+
+def cache(cache_decorator, name=None):
+    """
+    st.cache_data / st.cache_resource 를 감싸 호출 수, 미스 수, 소요 시간을 기록합니다.
+
+        @instrumentation.cache(st.cache_data(ttl=300))
+        def load_data(): ...
+
+    캐시 안쪽 함수가 실제로 실행된 횟수를 미스로, 나머지를 히트로 봅니다.
+    """
+    def decorate(fn):
+        key = name or fn.__name__
+
+        @wraps(fn)
+        def on_miss(*args, **kwargs):
+            _add(_caches, key, misses=1)
+            return fn(*args, **kwargs)
+
+        cached_fn = cache_decorator(on_miss)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            _add(_caches, key, calls=1)
+            with span(f"cache:{key}"):
+                return cached_fn(*args, **kwargs)
+
+        wrapper.clear = cached_fn.clear
+        return wrapper
+    return decorate
+
+
+def record_payload(name, nbytes):
+    """화면으로 보내는 데이터 크기(바이트) 기록"""
+    _add(_payloads, name, count=1, total=nbytes, last=nbytes)
+
+
+def count(name, n=1):
+    """이름 붙인 사건의 횟수를 n 만큼 증가"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def enabled():
+    """계측 결과를 화면에 보여 줄지 여부 (?debug=1 또는 APP_DEBUG=1)"""
+    import streamlit as st
+    return os.environ.get("APP_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+
+def plotly_chart(fig, name, **kwargs):
+    """st.plotly_chart 를 그리면서 구간 시간과 (디버그 모드에서는) figure JSON 크기를 기록"""
+    import streamlit as st
+    with span(f"render:{name}"):
+        if enabled():
+            record_payload(name, len(fig.to_json()))
+        return st.plotly_chart(fig, **kwargs)
+
+
+def snapshot():
+    """현재까지 모인 계측 값을 dict 로 반환"""
+    with _lock:
+        caches = {
+            name: {**row, "hits": row.get("calls", 0) - row.get("misses", 0)}
+            for name, row in _caches.items()
+        }
+        return {
+            "started_at": _started_at,
+            "exported_at": time.time(),
+            "pid": os.getpid(),
+            "spans": {name: dict(row) for name, row in _spans.items()},
+            "caches": caches,
+            "payloads": {name: dict(row) for name, row in _payloads.items()},
+            "counters": dict(_counters),
+        }
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _caches.clear()
+        _payloads.clear()
+        _counters.clear()
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def to_prometheus(data=None):
+    """Prometheus text exposition 형식 문자열"""
+    data = data or snapshot()
+    lines = [
+        "# TYPE app_span_seconds summary",
+        *(
+            f'app_span_seconds_{field}{{span="{_label(name)}"}} {row.get(key, 0)}'
+            for name, row in data["spans"].items()
+            for field, key in (("count", "count"), ("sum", "total"))
+        ),
+        "# TYPE app_span_seconds_max gauge",
+        *(f'app_span_seconds_max{{span="{_label(name)}"}} {row.get("max", 0)}' for name, row in data["spans"].items()),
+        "# TYPE app_cache_calls_total counter",
+        *(f'app_cache_calls_total{{cache="{_label(name)}"}} {row.get("calls", 0)}' for name, row in data["caches"].items()),
+        "# TYPE app_cache_misses_total counter",
+        *(f'app_cache_misses_total{{cache="{_label(name)}"}} {row.get("misses", 0)}' for name, row in data["caches"].items()),
+        "# TYPE app_payload_bytes summary",
+        *(
+            f'app_payload_bytes_{field}{{payload="{_label(name)}"}} {row.get(key, 0)}'
+            for name, row in data["payloads"].items()
+            for field, key in (("count", "count"), ("sum", "total"))
+        ),
+        "# TYPE app_events_total counter",
+        *(f'app_events_total{{event="{_label(name)}"}} {value}' for name, value in data["counters"].items()),
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def export_json(path=None):
+    path = path or os.path.join(EXPORT_DIR, f"metrics-{os.getpid()}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, ensure_ascii=False, indent=2)
+    return path
+
+
+def export_prometheus(path=None):
+    path = path or os.path.join(EXPORT_DIR, f"metrics-{os.getpid()}.prom")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(to_prometheus())
+    return path
+
+
+def debug_panel():
+    """디버그 모드일 때 사이드바에 계측 결과와 내보내기 버튼을 표시"""
+    if not enabled():
+        return
+    import streamlit as st
+
+    data = snapshot()
+    with st.sidebar.expander("🔧 성능 계측", expanded=False):
+        if data["spans"]:
+            st.write("**구간 시간 (ms)**")
+            st.dataframe(
+                {
+                    "구간": list(data["spans"]),
+                    "횟수": [row["count"] for row in data["spans"].values()],
+                    "평균": [row["total"] / row["count"] * 1000 for row in data["spans"].values()],
+                    "최대": [row["max"] * 1000 for row in data["spans"].values()],
+                },
+                hide_index=True,
+            )
+        if data["caches"]:
+            st.write("**캐시 히트/미스**")
+            st.dataframe(
+                {
+                    "함수": list(data["caches"]),
+                    "히트": [row["hits"] for row in data["caches"].values()],
+                    "미스": [row.get("misses", 0) for row in data["caches"].values()],
+                },
+                hide_index=True,
+            )
+        if data["payloads"]:
+            st.write("**전송 크기 (KiB, 마지막 값)**")
+            st.dataframe(
+                {
+                    "항목": list(data["payloads"]),
+                    "KiB": [row["last"] / 1024 for row in data["payloads"].values()],
+                },
+                hide_index=True,
+            )
+
+        if data["counters"]:
+            st.write("**횟수**")
+            st.dataframe(
+                {"항목": list(data["counters"]), "횟수": list(data["counters"].values())},
+                hide_index=True,
+            )
+
+        col1, col2 = st.columns(2)
+        if col1.button("JSON 저장"):
+            st.caption(f"저장됨: {export_json()}")
+        if col2.button("Prometheus 저장"):
+            st.caption(f"저장됨: {export_prometheus()}")
@@ -0,0 +1 @@
+"""시가총액 페이지들이 함께 쓰는 데이터 수집/가공 모듈"""
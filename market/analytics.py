@@ -0,0 +1,71 @@
+"""
+여러 종목의 지표를 한 번에 계산하는 분석 모듈
+
+모든 종목의 종가를 날짜 x 종목 형태의 한 행렬로 맞춘 뒤
+수익률, 변동성, 시가총액, 순위를 종목별 반복문 없이 열 단위 연산으로 구합니다.
+"""
+import numpy as np
+import pandas as pd
+
+from market.currency import CURRENCY_SYMBOLS, REPORTING_CURRENCY
+
+TRADING_DAYS = 252  # 1년 거래일 수
+# 보고 통화(MARKET_REPORTING_CURRENCY)로 붙이는 가격/시가총액 열 이름. USD 이면 'Latest Price ($)', 'Market Cap (T$)'
+_SYMBOL = CURRENCY_SYMBOLS.get(REPORTING_CURRENCY)
+PRICE = f"Latest Price ({_SYMBOL or REPORTING_CURRENCY})"
+MARKET_CAP = f"Market Cap (T{_SYMBOL})" if _SYMBOL else f"Market Cap (T {REPORTING_CURRENCY})"
+
+
+def shares_outstanding(info):
+    """기업 정보에서 발행주식수를 꺼냄 (없으면 1)"""
+    return info.get('sharesOutstanding', info.get('impliedSharesOutstanding', 1))
+
+
+def market_cap_matrix(close, shares_history, current_shares):
+    """
+    날짜별 시가총액(보고 통화 조 단위) 행렬을 계산합니다.
+
+    close: 날짜 x 종목 종가, shares_history: 날짜 x 종목 발행주식수 공시 이력,
+    current_shares: 종목 -> 현재 발행주식수 Series.
+    각 날짜에는 그날까지의 마지막 공시값을 쓰고, 첫 공시 이전은 가장 이른 공시값,
+    이력이 없는 종목은 현재 발행주식수를 사용합니다.
+    """
+    shares = shares_history.reindex(columns=close.columns)
+    shares = shares.reindex(shares.index.union(close.index)).ffill().bfill().reindex(close.index)
+    shares = shares.fillna(current_shares.reindex(close.columns))
+    return close * shares / 1e12
+
+
+def compute_metrics(close, shares):
+    """
+    종가 행렬과 발행주식수로 기업별 지표를 계산합니다.
+
+    close: 날짜 x 기업 종가 DataFrame
+    shares: 기업 -> 발행주식수 Series
+    반환: 기업을 인덱스로 하는 DataFrame
+        PRICE, MARKET_CAP, 'Rank',
+        'Return 1Y (%)', 'Return 3Y (%)', 'Annual Volatility (%)'
+    """
+    # 거래소 휴장일 차이로 생긴 빈 칸은 직전 값으로 채워 가격 조회에만 사용
+    filled = close.ffill()
+    counts = close.notna().sum()
+    latest = filled.iloc[-1]
+
+    return_1y = (latest / filled.iloc[-TRADING_DAYS] - 1) * 100 if len(close) >= TRADING_DAYS else latest * np.nan
+    return_3y = (latest / close.bfill().iloc[0] - 1) * 100
+
+    daily_returns = close.pct_change(fill_method=None)
+    volatility = daily_returns.std() * np.sqrt(TRADING_DAYS) * 100  # 연간 변동성
+
+    market_cap = latest * shares.reindex(close.columns) / 1e12  # 보고 통화 조 단위
+
+    metrics = pd.DataFrame({
+        PRICE: latest,
+        MARKET_CAP: market_cap,
+        'Rank': market_cap.rank(ascending=False, method='first'),
+        'Return 1Y (%)': return_1y.where(counts >= TRADING_DAYS),
+        'Return 3Y (%)': return_3y.where(counts >= TRADING_DAYS * 3),
+        'Annual Volatility (%)': volatility,
+    })
+    metrics.index.name = 'Company'
+    return metrics
@@ -0,0 +1,70 @@
+"""
+여러 종목의 시계열을 한 덩어리로 담는 읽기 전용 블록
+
+기업별 DataFrame 딕셔너리 대신 (필드 x 기업 x 날짜) float32 배열 하나에
+화면에서 쓰는 필드(종가, 시가총액, 롤링 지표)만 담습니다. st.cache_resource 에 넣어
+세션마다 pickle/복사하지 않고 같은 배열을 함께 읽으며, 배열은 쓰기 금지로 만들어
+한 세션이 실수로 값을 바꿔 다른 세션에 영향을 주는 일을 막습니다.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ('Close', 'Market_Cap', 'Vol_30', 'Vol_90', 'Vol_252', 'MA_50', 'MA_200', 'Drawdown')
+DTYPE = np.float32  # 차트와 비교에는 유효숫자 7자리면 충분
+
+
+class PriceBlock:
+    """날짜 축을 공유하는 기업별 시계열 묶음. 값이 없는 날짜는 NaN 입니다."""
+
+    def __init__(self, dates, companies, values, fields=FIELDS):
+        self.fields = tuple(fields)
+        self.dates = pd.DatetimeIndex(dates, name="Date")
+        self.companies = pd.Index(companies, name="Company")
+        self.values = np.ascontiguousarray(values, dtype=DTYPE)
+        self.values.setflags(write=False)
+        self._positions = {company: i for i, company in enumerate(self.companies)}
+        # 데이터 내용이 바뀌었는지 구분하는 짧은 버전 문자열
+        self.version = hashlib.sha1(self.values.tobytes() + self.dates.asi8.tobytes()).hexdigest()[:12]
+
+    @classmethod
+    def from_frames(cls, **frames):
+        """
+        필드 이름 -> 날짜 x 기업 DataFrame 으로 블록을 만듭니다.
+
+            PriceBlock.from_frames(Close=close, Market_Cap=market_cap)
+        """
+        fields = [field for field in FIELDS if field in frames]
+        first = frames[fields[0]]
+        values = np.stack([
+            frames[field].reindex(index=first.index, columns=first.columns).to_numpy(DTYPE).T
+            for field in fields
+        ])
+        return cls(first.index, first.columns, values, fields)
+
+    def __len__(self):
+        return len(self.companies)
+
+    def __contains__(self, company):
+        return company in self._positions
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    def series(self, company, field='Market_Cap', start=0):
+        """
+        한 기업의 시계열 (start 번째 날짜부터, 배열을 복사하지 않는 읽기 전용 뷰).
+        값이 없는 날짜는 NaN 으로 남으므로 필요하면 쓰는 쪽에서 건너뜀 (downsample, connectgaps)
+        """
+        row = self.values[self.fields.index(field), self._positions[company], start:]
+        return pd.Series(row, index=self.dates[start:], name=company, copy=False)
+
+    def frame(self, field='Close'):
+        """날짜 x 기업 DataFrame (배열을 복사하지 않는 읽기 전용 뷰)"""
+        return pd.DataFrame(self.values[self.fields.index(field)].T, index=self.dates, columns=self.companies, copy=False)
+
+    def start_position(self, since):
+        """since 이후 첫 날짜의 위치 (기간별로 자를 때 사용)"""
+        return int(self.dates.searchsorted(since))
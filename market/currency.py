@@ -0,0 +1,137 @@
+"""
+통화/거래소 정규화 (환율 환산, 거래일 맞추기)
+
+유니버스의 종목마다 거래 통화(currency)와 거래소 달력(calendar)을 붙이고,
+현지 통화 가격을 보고 통화(MARKET_REPORTING_CURRENCY, 기본 USD)로 환산합니다.
+환율은 Yahoo 의 '<통화><보고 통화>=X' 일봉(예: SARUSD=X, 1 SAR 당 USD)을 주가와 같은 저장소에
+같은 방식으로 받아 두고, 날짜 기준 직전 값(asof)으로 종가 행렬 전체에 한 번에 곱합니다.
+
+거래소마다 휴장일과 주말(예: 사우디 Tadawul 은 일~목)이 달라 날짜 x 종목 행렬에 빈 칸이 생기고,
+빈 칸 때문에 다른 종목의 일간 수익률까지 빠지지 않도록 보고 달력의 거래일로 행을 맞춘 뒤
+휴장일은 직전 종가로 채웁니다(최대 MAX_GAP 거래일).
+
+    python -c "from market.currency import listing; print(listing('005930.KS'))"   # ('KRW', 'XKRX')
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+REPORTING_CURRENCY = os.environ.get("MARKET_REPORTING_CURRENCY", "USD")
+REPORTING_CALENDAR = os.environ.get("MARKET_REPORTING_CALENDAR", "XNYS")
+MAX_GAP = 5  # 휴장일을 직전 종가로 채우는 최대 거래일 수
+
+# 티커 접미사 -> (거래 통화, 거래소 달력). 유니버스 CSV 에 값이 없을 때 사용
+SUFFIXES = {
+    ".SR": ("SAR", "XSAU"),
+    ".KS": ("KRW", "XKRX"),
+    ".KQ": ("KRW", "XKRX"),
+    ".T": ("JPY", "XTKS"),
+    ".L": ("GBp", "XLON"),
+    ".HK": ("HKD", "XHKG"),
+    ".TW": ("TWD", "XTAI"),
+    ".PA": ("EUR", "XPAR"),
+    ".DE": ("EUR", "XETR"),
+    ".AS": ("EUR", "XAMS"),
+    ".SW": ("CHF", "XSWX"),
+    ".TO": ("CAD", "XTSE"),
+}
+DEFAULT_LISTING = ("USD", "XNYS")
+# 보조 단위로 호가하는 통화 -> (기준 통화, 배율). 예: 런던 상장 종목은 펜스(GBp)
+SUBUNITS = {"GBp": ("GBP", 0.01), "GBX": ("GBP", 0.01), "ILA": ("ILS", 0.01), "ZAc": ("ZAR", 0.01)}
+# 화면 표시용 통화 기호와 이름 (없으면 통화 코드를 그대로 씀)
+CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€", "GBP": "£", "JPY": "¥", "KRW": "₩"}
+CURRENCY_NAMES = {"USD": "달러", "EUR": "유로", "GBP": "파운드", "JPY": "엔", "KRW": "원", "SAR": "리얄"}
+REPORTING_NAME = CURRENCY_NAMES.get(REPORTING_CURRENCY, REPORTING_CURRENCY)
+# 달력별 거래 요일 (없으면 월~금)
+WEEKMASKS = {"XSAU": "Sun Mon Tue Wed Thu"}
+DEFAULT_WEEKMASK = "Mon Tue Wed Thu Fri"
+
+
+def listing(symbol):
+    """티커 접미사로 추정한 (거래 통화, 거래소 달력)"""
+    for suffix, value in SUFFIXES.items():
+        if symbol.endswith(suffix):
+            return value
+    return DEFAULT_LISTING
+
+
+def tag(universe):
+    """유니버스에 currency, calendar 열을 채움 (CSV 에 적힌 값이 우선)"""
+    universe = universe.copy()
+    inferred = pd.DataFrame([listing(symbol) for symbol in universe["symbol"]],
+                            index=universe.index, columns=["currency", "calendar"])
+    for column in inferred.columns:
+        values = universe[column] if column in universe.columns else pd.Series(np.nan, index=universe.index)
+        universe[column] = values.fillna(inferred[column])
+    return universe
+
+
+def _base(currency):
+    """보조 단위 통화 -> (기준 통화, 배율)"""
+    return SUBUNITS.get(currency, (currency, 1.0))
+
+
+def fx_symbol(currency, reporting=REPORTING_CURRENCY):
+    """1 단위 currency 의 reporting 가격 일봉 티커 (예: SAR -> 'SARUSD=X')"""
+    return f"{_base(currency)[0]}{reporting}=X"
+
+
+def fx_symbols(currencies, reporting=REPORTING_CURRENCY):
+    """환산에 필요한 환율 티커 목록 (보고 통화와 같은 통화는 제외)"""
+    return sorted({fx_symbol(c, reporting) for c in set(currencies) if _base(c)[0] != reporting})
+
+
+def is_fx(symbol):
+    return symbol.endswith("=X")
+
+
+def rate_matrix(index, currencies, fx, reporting=REPORTING_CURRENCY):
+    """
+    날짜 x 종목 환산 배율 (현지 가격 x 배율 = 보고 통화 가격).
+    index: 날짜, currencies: 종목 -> 거래 통화 Series, fx: 날짜 x 환율 티커 종가 (store.read_closes 결과)
+    환율이 없는 통화의 종목은 잘못된 값 대신 NaN 이 됩니다.
+    """
+    index = pd.DatetimeIndex(index)
+    bases = [_base(c) for c in currencies]
+    # 외환시장과 거래소의 휴일이 다르므로 각 날짜 직전의 환율을 씀 (첫 환율 이전 날짜는 첫 값으로)
+    fx = fx.reindex(fx.index.union(index)).ffill().bfill().reindex(index)
+    fx = fx.rename(columns={symbol: symbol[:-len(reporting) - 2] for symbol in fx.columns})
+    fx[reporting] = 1.0
+    rates = fx.reindex(columns=[base for base, _ in bases]).to_numpy() * np.array([scale for _, scale in bases])
+    return pd.DataFrame(rates, index=index, columns=currencies.index)
+
+
+def convert(frame, currencies, fx, reporting=REPORTING_CURRENCY):
+    """날짜 x 종목 가격 행렬을 보고 통화로 환산"""
+    rates = rate_matrix(frame.index, currencies.reindex(frame.columns).fillna(reporting), fx, reporting)
+    return frame * rates
+
+
+def trading_days(start, end, calendar=REPORTING_CALENDAR):
+    """달력의 거래 요일만 남긴 날짜 (공휴일은 구분하지 않음)"""
+    return pd.bdate_range(start, end, freq="C", weekmask=WEEKMASKS.get(calendar, DEFAULT_WEEKMASK), name="Date")
+
+
+def asof(frame, index, max_gap=MAX_GAP):
+    """frame 을 index 날짜로 옮김. 그 날짜에 값이 없으면 직전 값(최대 max_gap 행 전까지)"""
+    return frame.reindex(frame.index.union(index)).ffill(limit=max_gap).reindex(index)
+
+
+def align(frame, calendar=REPORTING_CALENDAR, max_gap=MAX_GAP):
+    """
+    여러 거래소의 날짜 x 종목 행렬을 보고 달력의 거래일로 맞춥니다.
+    보고 달력의 거래 요일 중 한 종목이라도 거래한 날만 남기고, 그날 휴장한 종목은
+    직전 종가로 채웁니다. 보고 달력에 없는 요일(예: 일요일)의 종가는 다음 거래일에 값이 없을 때 그날로 넘어갑니다.
+    """
+    if frame.empty:
+        return frame
+    days = trading_days(frame.index.min(), frame.index.max(), calendar)
+    days = days[days.isin(frame.index)]
+    # 종목마다 첫 거래일 이전은 채우지 않음 (ffill 은 앞쪽 NaN 을 건드리지 않음)
+    return asof(frame, days, max_gap)
+
+
+def normalize(closes, currencies, fx, calendar=REPORTING_CALENDAR, reporting=REPORTING_CURRENCY):
+    """현지 통화 종가 행렬 -> 보고 통화로 환산하고 보고 달력에 맞춘 행렬"""
+    return align(convert(closes, currencies, fx, reporting), calendar)
@@ -0,0 +1,88 @@
+"""
+기록해 둔 시가총액 데이터셋 (Parquet, long 형식)
+
+snapshot.load_dashboard 가 계산한 일별 시가총액(보고 통화로 환산, 보고 달력에 맞춤)을
+(Date, Company, Symbol, Market Cap (T$)) 행으로 파일 하나에 기록합니다.
+시가총액 열 이름(VALUE)은 보고 통화에 따라 정해집니다 (analytics.MARKET_CAP).
+페이지는 이 파일을 한 번 읽기만 하면 되고, 필요하면 분기/월 단위로 줄여서 씁니다.
+
+    python -m market.dataset global_top10          # 저장소를 채운 뒤 .cache/datasets/global_top10.parquet 생성
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from market.analytics import MARKET_CAP
+from market.files import write_atomic
+from market.snapshot import load_dashboard
+from market.universe import as_dict, load_universe
+
+DATASET_DIR = os.environ.get(
+    "MARKET_DATASET_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "datasets"),
+)
+VALUE = MARKET_CAP
+# 화면에서 고르는 주기 -> pandas resample 규칙 (None 이면 일별 그대로)
+FREQUENCIES = {"분기": "QE", "월": "ME", "일": None}
+
+
+def dataset_path(universe_name):
+    return os.path.join(DATASET_DIR, f"{universe_name}.parquet")
+
+
+def build_dataset(store, universe, years=3):
+    """저장소 데이터로 일별 시가총액 long 형식 DataFrame 을 만듦 (수집은 하지 않음)"""
+    frames, _ = load_dashboard(store, universe, years, with_rolling=False)
+    market_caps = frames['Market_Cap']
+
+    long = market_caps.stack().rename(VALUE).reset_index()
+    long.columns = ["Date", "Company", VALUE]
+    long.insert(2, "Symbol", long["Company"].map(as_dict(universe)))
+    long["Company"] = pd.Categorical(long["Company"], categories=list(market_caps.columns))
+    long["Symbol"] = long["Symbol"].astype("category")
+    long[VALUE] = long[VALUE].astype("float32")
+    return long
+
+
+def write_dataset(frame, path):
+    return write_atomic(path, lambda tmp_path: frame.to_parquet(tmp_path, index=False))
+
+
+def load_dataset(path, companies=None, freq=None):
+    """
+    데이터셋 파일을 읽습니다. companies 가 있으면 그 기업 행만 읽고,
+    freq 가 있으면('QE', 'ME' 등) 기업별로 그 주기의 마지막 값만 남깁니다.
+    """
+    filters = [("Company", "in", list(companies))] if companies is not None else None
+    frame = pd.read_parquet(path, columns=["Date", "Company", VALUE], filters=filters)
+    if freq is None or frame.empty:
+        return frame
+    wide = frame.pivot(index="Date", columns="Company", values=VALUE)
+    resampled = wide.resample(freq).last().dropna(how="all")
+    return resampled.stack().rename(VALUE).reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="저장소를 채우고 시가총액 데이터셋 파일을 생성")
+    parser.add_argument("universe", nargs="?", default="global_top10", help="data/universes 의 유니버스 이름")
+    parser.add_argument("--output", default=None, help="출력 파일 (기본: MARKET_DATASET_DIR/<유니버스>.parquet)")
+    parser.add_argument("--years", type=int, default=3)
+    args = parser.parse_args()
+
+    from market.refresher import refresh_universe
+    from market.store import PriceStore
+
+    store = PriceStore()
+    universe = load_universe(args.universe)
+    for symbol, error in refresh_universe(store, universe):
+        if error is not None:
+            print(f"{symbol} 수집 실패: {error}")
+
+    frame = build_dataset(store, universe, args.years)
+    path = write_dataset(frame, args.output or dataset_path(args.universe))
+    print(f"{frame['Company'].nunique()}개 기업, {len(frame)}행 -> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+긴 시계열을 차트 픽셀 수에 맞게 줄이는 다운샘플링
+
+Largest-Triangle-Three-Buckets(LTTB) 는 선 모양을 최대한 유지하면서 점 수를 줄이고,
+min/max 버킷은 구간별 최저/최고점을 보존해 급등락을 놓치지 않습니다.
+"""
+import numpy as np
+import pandas as pd
+
+CHART_WIDTH_PX = 1200  # wide 레이아웃에서 메인 차트의 대략적인 가로 픽셀
+SMALL_BUCKET = 16  # 버킷 크기가 이 이하이면 LTTB 를 순수 파이썬으로 계산
+PX_PER_POINT = 4  # 점 하나가 차지하는 픽셀 (LTTB 로 고르면 이 정도 간격에서도 선 모양이 유지됨)
+
+
+def auto_points(width_px=CHART_WIDTH_PX, visible_fraction=1.0):
+    """
+    한 trace 에 그릴 점 개수를 고릅니다.
+    visible_fraction 은 전체 데이터 중 화면에 보이는 비율(확대 정도)로,
+    확대해서 보는 구간이 좁을수록 전체 점 수를 늘려 보이는 구간의 해상도를 유지합니다.
+    """
+    return int(width_px / PX_PER_POINT / max(visible_fraction, 1e-3))
+
+
+def _as_float(index):
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    return np.asarray(index, dtype=np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """LTTB 로 고른 점들의 위치(정수 배열)를 반환"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # 첫 점과 마지막 점은 고정하고, 가운데를 n_out - 2 개 버킷으로 나눔
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, sizes = edges[:-1], np.diff(edges)
+
+    # 각 버킷의 "다음 버킷 평균점" (마지막 버킷은 마지막 점)
+    avg_x = np.append(np.add.reduceat(x[1:n - 1], starts - 1)[1:] / sizes[1:], x[-1])
+    avg_y = np.append(np.add.reduceat(y[1:n - 1], starts - 1)[1:] / sizes[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    if sizes.max() <= SMALL_BUCKET:
+        # 버킷이 작으면 NumPy 호출 비용이 더 크므로 순수 파이썬 반복으로 계산
+        xs, ys, bounds = x.tolist(), y.tolist(), edges.tolist()
+        mx, my = avg_x.tolist(), avg_y.tolist()
+        a = 0
+        for i in range(n_out - 2):
+            ax, ay = xs[a], ys[a]
+            best = -1.0
+            for j in range(bounds[i], bounds[i + 1]):
+                area = abs((ax - mx[i]) * (ys[j] - ay) - (ax - xs[j]) * (my[i] - ay))
+                if area > best:
+                    best, a_next = area, j
+            a = a_next
+            selected[i + 1] = a
+        return selected
+
+    # 버킷들을 (버킷 수 x 최대 버킷 크기) 행렬로 펼침 (모자란 칸은 버킷 첫 점으로 채움)
+    offsets = starts[:, None] + np.arange(sizes.max())
+    offsets = np.where(offsets < edges[1:, None], offsets, starts[:, None])
+    bucket_x, bucket_y = x[offsets], y[offsets]
+
+    a = 0
+    for i in range(n_out - 2):
+        # 직전 선택점, 다음 버킷 평균점과 이루는 삼각형 넓이가 가장 큰 점을 선택
+        area = np.abs(
+            (x[a] - avg_x[i]) * (bucket_y[i] - y[a]) - (x[a] - bucket_x[i]) * (avg_y[i] - y[a])
+        )
+        a = offsets[i, area.argmax()]
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """버킷마다 최저점과 최고점을 남기는 방식 (n_out 의 절반 개 버킷)"""
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_buckets < 1 or n_out >= n:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    lows = np.minimum.reduceat(y, starts)
+    highs = np.maximum.reduceat(y, starts)
+
+    picked = []
+    for lo, hi, low, high in zip(starts, edges[1:], lows, highs):
+        bucket = y[lo:hi]
+        picked.append(lo + int(np.argmax(bucket == low)))
+        picked.append(lo + int(np.argmax(bucket == high)))
+    return np.unique(np.asarray(picked + [0, n - 1]))
+
+
+def downsample(series, n_out, method="lttb"):
+    """Series 를 n_out 개 안팎의 점으로 줄여서 반환 (인덱스 유지)"""
+    series = series.dropna()
+    # 절반 이하로 줄어들지 않으면 계산 비용에 비해 이득이 적으므로 원본 유지
+    if len(series) <= 2 * n_out:
+        return series
+    y = series.to_numpy(dtype=np.float64)
+    if method == "minmax":
+        positions = minmax_indices(y, n_out)
+    else:
+        positions = lttb_indices(_as_float(series.index), y, n_out)
+    return series.iloc[positions]
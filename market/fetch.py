@@ -0,0 +1,115 @@
+"""yfinance 데이터 수집 계층"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+import instrumentation
+from market.gateway import GATEWAY
+
+# 동시에 보낼 최대 요청 수 (Yahoo 쪽 부담을 고려해 너무 크게 잡지 않음)
+MAX_WORKERS = 8
+
+# get_info() 결과 중 실제로 쓰는 필드
+SHARE_FIELDS = ('sharesOutstanding', 'impliedSharesOutstanding')
+
+
+def _yf():
+    """yfinance 는 import 에 1초 가까이 걸리므로 실제로 수집할 때만 불러옴"""
+    import yfinance
+    return yfinance
+
+
+def fetch_stock(symbol, period="3y", start=None):
+    """한 종목의 주가 이력을 가져오는 함수 (start 가 있으면 그 날짜부터만)"""
+    stock = _yf().Ticker(symbol)
+    with instrumentation.span("yfinance:get_history"):
+        if start is not None:
+            return GATEWAY.call(("get_history", symbol, str(start)), lambda: stock.get_history(start=start))
+        return GATEWAY.call(("get_history", symbol, period), lambda: stock.get_history(period=period))
+
+
+def download_closes(symbols, start=None, period="3y"):
+    """
+    여러 종목의 수정 종가를 yf.download 한 번으로 받아 날짜 x 종목 DataFrame 으로 돌려줍니다.
+
+    auto_adjust=True 로 받아 'Close' 열을 곧바로 수정 종가로 쓰므로
+    yfinance 버전에 따라 'Adj Close' 열이 있든 없든 결과가 같습니다.
+    데이터가 전혀 없는 종목은 열에서 빠집니다.
+    """
+    symbols = list(symbols)
+    kwargs = {"start": start} if start is not None else {"period": period}
+    with instrumentation.span("yfinance:download"):
+        data = GATEWAY.call(
+            ("download", tuple(symbols), str(start), period),
+            lambda: _yf().download(symbols, auto_adjust=True, group_by="column", progress=False, **kwargs),
+        )
+    if data.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="Date"))
+
+    if isinstance(data.columns, pd.MultiIndex):
+        close = data["Close"]
+    else:
+        # 예전 yfinance 는 종목이 하나면 열이 한 단계뿐
+        close = data[["Close"]].set_axis(symbols[:1], axis=1)
+    close.index = pd.DatetimeIndex(close.index).tz_localize(None)
+    close.index.name = "Date"
+    close = close.dropna(axis=1, how="all")
+    return close[[s for s in symbols if s in close.columns]]
+
+
+def fetch_fundamentals(symbol, start=None):
+    """
+    발행주식수 관련 정보를 가져오는 함수.
+    get_info() 에서 필요한 필드만 남기고, 과거 발행주식수 이력(get_shares_full)을 함께 받습니다.
+    이력이 없는 종목은 빈 Series 를 돌려줍니다.
+    """
+    stock = _yf().Ticker(symbol)
+    with instrumentation.span("yfinance:get_info"):
+        info = GATEWAY.call(("get_info", symbol), stock.get_info)
+    fields = {key: info.get(key) for key in SHARE_FIELDS}
+
+    try:
+        with instrumentation.span("yfinance:get_shares_full"):
+            shares = GATEWAY.call(("get_shares_full", symbol, str(start)), lambda: stock.get_shares_full(start=start))
+    except Exception:
+        shares = None
+    if shares is None or len(shares) == 0:
+        return fields, pd.Series(dtype=float)
+
+    # 같은 날 여러 번 공시된 값은 마지막 값만 사용 (합쳐진 요청과 결과를 공유하므로 원본은 바꾸지 않음)
+    shares = pd.Series(shares.to_numpy(), index=pd.DatetimeIndex(shares.index).tz_localize(None).normalize())
+    return fields, shares.groupby(level=0).last().astype(float)
+
+
+def run_many(fn, symbols, max_workers=MAX_WORKERS, **kwargs_by_symbol):
+    """
+    fn(symbol, ...) 을 스레드 풀에서 동시에 실행합니다.
+    kwargs_by_symbol 은 {인자 이름: {종목: 값}} 형태로 종목별 인자를 넘길 때 씁니다.
+    끝나는 순서대로 (symbol, result, error) 를 하나씩 돌려주므로
+    호출하는 쪽에서 진행 상황과 종목별 오류를 바로 표시할 수 있습니다.
+    """
+    symbols = list(symbols)
+    if not symbols:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as pool:
+        futures = {
+            pool.submit(fn, symbol, **{name: values.get(symbol) for name, values in kwargs_by_symbol.items()}): symbol
+            for symbol in symbols
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                yield symbol, None, e
+            else:
+                yield symbol, result, None
+
+
+def fetch_many(symbols, starts=None, max_workers=MAX_WORKERS):
+    """
+    여러 종목의 주가 이력을 동시에 가져옵니다.
+    starts 에 종목별 시작일이 있으면 그 종목은 해당 날짜 이후만 받습니다(증분 수집).
+    """
+    return run_many(fetch_stock, symbols, max_workers, start=starts or {})
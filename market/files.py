@@ -0,0 +1,28 @@
+"""
+파일 쓰기 도우미
+"""
+import os
+
+
+def write_atomic(path, write):
+    """
+    write(임시 경로) 로 임시 파일을 쓴 뒤 path 로 교체합니다.
+    다른 프로세스가 읽는 도중 반쯤 쓴 파일을 보지 않게 합니다.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def write_bytes_atomic(path, payload):
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+    return write_atomic(path, write)
@@ -0,0 +1,118 @@
+"""
+yfinance 로 나가는 모든 요청이 지나는 관문
+
+- single-flight: 같은 요청이 이미 진행 중이면 새로 보내지 않고 그 결과를 함께 받음
+- token bucket: 프로세스 전체의 초당 요청 수를 제한해 Yahoo 쪽 차단을 피함
+- 재시도: 연결 오류나 요청 제한처럼 일시적인 실패는 지터를 섞은 지수 백오프로 다시 시도
+
+합쳐진/재시도/실패한 요청 수는 instrumentation 카운터(gateway:*)로 집계됩니다.
+"""
+import os
+import random
+import threading
+import time
+
+import instrumentation
+
+RATE = float(os.environ.get("YF_RATE_LIMIT", 5))  # 초당 요청 수
+BURST = 10  # 한꺼번에 보낼 수 있는 최대 요청 수
+RETRIES = 3  # 첫 시도 이후 재시도 횟수
+BACKOFF = 0.5  # 첫 재시도 전 최대 대기(초), 시도마다 두 배
+MAX_BACKOFF = 8.0
+
+
+def is_transient(error):
+    """다시 시도하면 성공할 수 있는 오류인지 (연결/시간 초과/요청 제한)"""
+    return isinstance(error, OSError) or "RateLimit" in type(error).__name__
+
+
+class TokenBucket:
+    """초당 rate 개씩 채워지고 최대 capacity 개까지 쌓이는 토큰 통"""
+
+    def __init__(self, rate=RATE, capacity=BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기하고, 기다린 시간(초)을 돌려줌"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Gateway:
+    """요청 합치기, 속도 제한, 재시도를 한 번에 적용하는 호출 창구"""
+
+    def __init__(self, rate=RATE, burst=BURST, retries=RETRIES, backoff=BACKOFF, max_backoff=MAX_BACKOFF):
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def call(self, key, fn):
+        """
+        fn() 을 실행해 결과를 돌려줍니다. key 가 같은 호출이 이미 진행 중이면
+        새로 실행하지 않고 그 호출이 끝나기를 기다려 같은 결과(또는 예외)를 받습니다.
+        """
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+        instrumentation.count("gateway:calls")
+
+        if not leader:
+            instrumentation.count("gateway:coalesced")
+            call.done.wait()
+        else:
+            try:
+                call.result = self._attempt(fn)
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _attempt(self, fn):
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            instrumentation.count("gateway:upstream")
+            try:
+                return fn()
+            except Exception as e:
+                if attempt == self.retries or not is_transient(e):
+                    instrumentation.count("gateway:failed")
+                    raise
+                instrumentation.count("gateway:retried")
+                # full jitter: 0 ~ min(상한, backoff * 2^attempt) 사이에서 무작위로 대기
+                time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+
+# 프로세스 전체가 함께 쓰는 관문
+GATEWAY = Gateway()
@@ -0,0 +1,316 @@
+"""
+저장소 갱신 로직과 백그라운드 갱신 스레드 (stale-while-revalidate)
+
+페이지는 저장소에 있는 마지막 스냅샷을 바로 보여 주고,
+TTL 이 끝나기 전에 백그라운드 스레드가 미리 새 데이터를 받아 둡니다.
+요청 경로에서 수집을 기다리는 경우는 저장소에 한 번도 받은 적 없는 종목뿐입니다.
+"""
+import logging
+import threading
+import time
+from functools import partial
+from itertools import chain
+
+import pandas as pd
+
+from market import rolling
+from market.currency import fx_symbols, is_fx
+from market.fetch import download_closes, fetch_fundamentals, fetch_many, fetch_stock, run_many
+from market.store import DEFAULT_TTL, FUNDAMENTALS, FUNDAMENTALS_TTL
+
+logger = logging.getLogger(__name__)
+
+CHECK_INTERVAL = 300  # 5분마다 오래된 종목이 있는지 확인
+REFRESH_AHEAD = 600  # TTL 이 끝나기 10분 전부터 미리 갱신
+SHARES_HISTORY_YEARS = 4  # 발행주식수 이력을 받을 기간
+
+
+def _shares_start():
+    # 3년 차트의 첫날에도 직전 공시값이 있도록 1년 더 앞에서부터 받음
+    return (pd.Timestamp.today() - pd.DateOffset(years=SHARES_HISTORY_YEARS)).strftime("%Y-%m-%d")
+
+
+def refresh_symbols(store, symbols):
+    """
+    주어진 종목의 주가를 (가능하면 증분으로) 다시 받아 저장소에 반영합니다.
+    끝나는 순서대로 (symbol, error) 를 돌려줍니다. 성공하면 error 는 None 입니다.
+    """
+    symbols = list(symbols)
+    # 이력이 있는 종목은 마지막 저장일 근처부터만 받는 증분 수집
+    starts = store.delta_starts(symbols)
+
+    for symbol, hist, error in fetch_many(symbols, starts=starts):
+        try:
+            if error is not None:
+                raise error
+            if symbol not in starts or not store.merge_closes(symbol, hist['Close']):
+                # 처음 받는 종목이거나 수정주가가 바뀐 경우 전체 이력을 다시 받음
+                if symbol in starts:
+                    hist = fetch_stock(symbol)
+                store.write_closes(symbol, hist['Close'])
+        except Exception as e:
+            store.record_failure(symbol)
+            yield symbol, e
+        else:
+            yield symbol, None
+
+
+def refresh_symbols_batch(store, symbols):
+    """
+    refresh_symbols 와 같은 일을 종목별 요청 대신 yf.download 묶음 요청으로 합니다.
+    처음 받는 종목은 전체 기간을 한 번에, 이력이 있는 종목은 그중 가장 이른 증분 시작일부터
+    한 번에 받습니다. 수정주가가 바뀐 종목만 모아 한 번 더 전체 기간을 받습니다.
+    """
+    symbols = list(symbols)
+    if not symbols:
+        return
+    starts = store.delta_starts(symbols)
+    new = [symbol for symbol in symbols if symbol not in starts]
+    known = [symbol for symbol in symbols if symbol in starts]
+
+    refetch = []
+    for group, start in [(new, None), (known, min(starts.values(), default=None))]:
+        for symbol, close, error in _download_each(group, start):
+            try:
+                if error is not None:
+                    raise error
+                if start is None:
+                    store.write_closes(symbol, close)
+                elif not store.merge_closes(symbol, close):
+                    refetch.append(symbol)
+                    continue
+            except Exception as e:
+                store.record_failure(symbol)
+                yield symbol, e
+            else:
+                yield symbol, None
+
+    for symbol, close, error in _download_each(refetch, None):
+        try:
+            if error is not None:
+                raise error
+            store.write_closes(symbol, close)
+        except Exception as e:
+            store.record_failure(symbol)
+            yield symbol, e
+        else:
+            yield symbol, None
+
+
+def _download_each(symbols, start):
+    """download_closes 결과를 종목별 (symbol, close, error) 로 나눔"""
+    if not symbols:
+        return
+    try:
+        closes = download_closes(symbols, start=start)
+    except Exception as e:
+        for symbol in symbols:
+            yield symbol, None, e
+        return
+    for symbol in symbols:
+        if symbol in closes.columns:
+            yield symbol, closes[symbol], None
+        else:
+            yield symbol, None, ValueError("받은 데이터가 없습니다")
+
+
+def refresh_fundamentals(store, symbols):
+    """
+    주어진 종목의 발행주식수 정보와 이력을 다시 받아 저장소에 반영합니다.
+    refresh_symbols 와 같은 형태로 (symbol, error) 를 돌려줍니다.
+    """
+    symbols = list(symbols)
+    start = _shares_start()
+
+    for symbol, result, error in run_many(fetch_fundamentals, symbols, start=dict.fromkeys(symbols, start)):
+        try:
+            if error is not None:
+                raise error
+            store.write_fundamentals(symbol, *result)
+        except Exception as e:
+            store.record_failure(symbol, FUNDAMENTALS)
+            yield symbol, e
+        else:
+            yield symbol, None
+
+
+def _fill_one(store, symbol, prices=False, fundamentals=False, start=None):
+    if prices:
+        store.write_closes(symbol, fetch_stock(symbol)['Close'])
+    if fundamentals:
+        store.write_fundamentals(symbol, *fetch_fundamentals(symbol, start=start))
+
+
+def stale_fundamentals(store, symbols, ttl=FUNDAMENTALS_TTL):
+    """발행주식수를 다시 받아야 하는 종목 목록 (발행주식수가 없는 환율 티커는 제외)"""
+    return [symbol for symbol in store.stale_fundamentals(symbols, ttl=ttl) if not is_fx(symbol)]
+
+
+def incomplete_symbols(store, symbols, fundamentals=True):
+    """
+    주가나 발행주식수 중 하나라도 저장된 적 없는 종목 목록 (fundamentals=False 면 주가만 확인).
+    수집에 실패한 적이 있는 종목은 빼므로 요청 경로에서는 한 번만 시도하고,
+    다시 시도하는 것은 백그라운드 갱신 스레드가 재시도 간격에 맞춰 맡습니다.
+    """
+    symbols = list(symbols)
+    missing = store.missing_symbols(symbols)
+    missing = set(missing) - set(store.failed_symbols(missing)) if missing else set()
+    if fundamentals:
+        missing_fundamentals = stale_fundamentals(store, symbols, ttl=float("inf"))
+        if missing_fundamentals:
+            missing |= set(missing_fundamentals) - set(store.failed_symbols(missing_fundamentals, FUNDAMENTALS))
+    return [symbol for symbol in symbols if symbol in missing]
+
+
+def fill_missing(store, symbols):
+    """
+    저장소에 주가나 발행주식수가 한 번도 저장되지 않은 종목을 받아 채웁니다.
+    종목마다 주가와 발행주식수를 한 작업으로 묶어, 두 가지가 모두 저장된 종목부터
+    (symbol, error) 를 돌려주므로 화면에서는 먼저 끝난 종목부터 바로 그릴 수 있습니다.
+    """
+    symbols = list(symbols)
+    missing = set(store.missing_symbols(symbols))
+    missing_fundamentals = set(stale_fundamentals(store, symbols, ttl=float("inf")))
+    todo = [symbol for symbol in symbols if symbol in missing or symbol in missing_fundamentals]
+    start = _shares_start()
+
+    results = run_many(
+        partial(_fill_one, store), todo,
+        prices={symbol: symbol in missing for symbol in todo},
+        fundamentals={symbol: symbol in missing_fundamentals for symbol in todo},
+        start=dict.fromkeys(todo, start),
+    )
+    for symbol, _, error in results:
+        if error is not None:
+            # 아직 채우지 못한 쪽만 실패로 기록 (성공한 쪽은 저장할 때 기록이 지워짐)
+            if symbol in missing and store.missing_symbols([symbol]):
+                store.record_failure(symbol)
+            if symbol in missing_fundamentals and stale_fundamentals(store, [symbol], ttl=float("inf")):
+                store.record_failure(symbol, FUNDAMENTALS)
+        yield symbol, error
+
+
+def refresh_universe(store, universe):
+    """
+    유니버스 종목과 환산에 필요한 환율을 저장소에 채웁니다 (명령행 도구용, 동기).
+    처음 보는 종목은 전체를, 오래된 종목은 증분으로 받습니다. 반환: (종목, 오류) 목록
+    """
+    symbols = list(universe["symbol"])
+    prices = symbols + fx_symbols(universe["currency"])
+    return [*fill_missing(store, prices),
+            *refresh_symbols(store, store.stale_symbols(prices)),
+            *refresh_fundamentals(store, stale_fundamentals(store, symbols))]
+
+
+class BackgroundRefresher:
+    """
+    TTL 이 끝나기 전에 저장소를 미리 갱신하는 데몬 스레드.
+    주가는 갱신할 종목을 모아 refresh_symbols_batch 로 한 번에 받고, 발행주식수는 주가만 쓰는
+    종목(track(..., fundamentals=False))을 빼고 받습니다.
+    """
+
+    def __init__(self, store, symbols, ttl=DEFAULT_TTL, fundamentals_ttl=FUNDAMENTALS_TTL,
+                 check_interval=CHECK_INTERVAL, refresh_ahead=REFRESH_AHEAD):
+        self.store = store
+        self.symbols = list(symbols)
+        self.prices_only = set()  # 발행주식수는 갱신하지 않는 종목
+        self.ttl = ttl
+        self.fundamentals_ttl = fundamentals_ttl
+        self.check_interval = check_interval
+        self.refresh_ahead = refresh_ahead
+        self.last_run = None
+        self.last_errors = {}
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="market-refresher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def track(self, symbols, fundamentals=True):
+        """
+        갱신 대상에 종목을 추가하고, 새 종목이 있으면 다음 확인 주기를 기다리지 않고 곧바로 확인.
+        fundamentals=False 면 주가만 갱신 (다른 곳에서 발행주식수까지 등록한 종목은 그대로 둠)
+        """
+        symbols = set(symbols)
+        with self._lock:
+            tracked = set(self.symbols)
+            if fundamentals:
+                self.prices_only -= symbols
+            else:
+                self.prices_only |= symbols - tracked
+            if not tracked.issuperset(symbols):
+                self.symbols = sorted(tracked | symbols)
+                self._wake.set()
+        return self
+
+    def stopped(self):
+        return self._stop.is_set()
+
+    def stop(self, timeout=None):
+        """스레드를 멈추고, 진행 중인 갱신이 끝날 때까지(최대 timeout 초) 기다림"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def refresh_once(self):
+        """갱신 시점이 된 종목을 한 번 갱신"""
+        due = self.store.stale_symbols(self.symbols, ttl=max(0, self.ttl - self.refresh_ahead))
+        due_fundamentals = stale_fundamentals(
+            self.store, [symbol for symbol in self.symbols if symbol not in self.prices_only],
+            ttl=max(0, self.fundamentals_ttl - self.refresh_ahead),
+        )
+        # 실패한 종목은 재시도 시각이 된 뒤에만 다시 받음
+        waiting = set(self.store.failed_symbols(due, waiting=True))
+        due = [symbol for symbol in due if symbol not in waiting]
+        waiting = set(self.store.failed_symbols(due_fundamentals, FUNDAMENTALS, waiting=True))
+        due_fundamentals = [symbol for symbol in due_fundamentals if symbol not in waiting]
+        errors = {}
+        for symbol, error in chain(refresh_symbols_batch(self.store, due),
+                                   refresh_fundamentals(self.store, due_fundamentals)):
+            if error is not None:
+                errors[symbol] = error
+                logger.warning("%s 백그라운드 갱신 실패: %s", symbol, error)
+        # 새로 받은 봉만 롤링 지표에 반영
+        rolling.update(self.store, [symbol for symbol in due if symbol not in errors and not is_fx(symbol)])
+        self.last_run = time.time()
+        self.last_errors = errors
+        return due
+
+    def _run(self):
+        # 시작하자마자 한 번 확인해 재시작 직후의 오래된 스냅샷도 곧바로 갱신
+        while not self._stop.is_set():
+            try:
+                self.refresh_once()
+            except Exception:
+                logger.exception("백그라운드 갱신 중 오류")
+            self._wake.wait(self.check_interval)
+            self._wake.clear()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_refresher(store, symbols=(), fundamentals=True):
+    """
+    프로세스마다 하나인 백그라운드 갱신 스레드에 symbols 를 등록하고 돌려줍니다.
+    페이지는 실행할 때마다 보여 줄 종목을 등록하고 저장소의 마지막 스냅샷을 바로 씁니다.
+    주가만 쓰는 페이지는 fundamentals=False 로 등록합니다. 멈춘 뒤에 다시 부르면 새로 띄웁니다.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None or _shared.stopped():
+            _shared = BackgroundRefresher(store, []).track(symbols, fundamentals).start()
+            return _shared
+    return _shared.track(symbols, fundamentals)
+
+
+def stop_shared(timeout=None):
+    """shared_refresher 의 스레드를 멈춤 (벤치마크처럼 한 프로세스에서 여러 페이지를 돌릴 때)"""
+    with _shared_lock:
+        if _shared is not None:
+            _shared.stop(timeout)
@@ -0,0 +1,144 @@
+"""
+증분 롤링 지표 엔진 (이동 변동성, 이동평균, 낙폭)
+
+종목마다 최근 창 크기만큼의 종가/수익률과 창별 누적합을 상태로 저장소에 보관하고,
+새 봉이 들어오면 그 봉만 반영해 지표를 이어서 계산합니다(O(새 봉 수)).
+전체 이력을 다시 훑는 경우는 처음 계산할 때와 수정주가 반영으로 과거 값이 바뀐 경우뿐입니다.
+
+마지막 봉은 장중 값일 수 있어 다음 수집 때 바뀔 수 있으므로, 상태에는 마지막 직전 봉까지만
+확정해 저장하고 마지막 봉은 매번 다시 반영합니다.
+"""
+import math
+from collections import deque
+
+import pandas as pd
+
+from market.analytics import TRADING_DAYS
+
+VOL_WINDOWS = (30, 90, 252)  # 이동 변동성 창 (거래일)
+MA_WINDOWS = (50, 200)  # 이동평균 창 (거래일)
+COLUMNS = (
+    *(f"vol_{w}" for w in VOL_WINDOWS),
+    *(f"ma_{w}" for w in MA_WINDOWS),
+    "drawdown",
+)
+CORRELATION_WINDOW = 252
+
+
+class RollingState:
+    """한 종목의 롤링 계산 상태"""
+
+    def __init__(self):
+        self.last_date = None
+        self.last_close = None
+        self.closes = deque(maxlen=max(MA_WINDOWS))
+        self.returns = deque(maxlen=max(VOL_WINDOWS))
+        self.sums = {w: [0.0, 0.0] for w in VOL_WINDOWS}  # 창별 (수익률 합, 제곱합)
+        self.close_sums = {w: 0.0 for w in MA_WINDOWS}
+        self.peak = None
+
+    def push(self, date, close):
+        """봉 하나를 반영하고 그 날짜의 지표 dict 를 돌려줌"""
+        if self.last_close is not None:
+            r = close / self.last_close - 1
+            for w, sums in self.sums.items():
+                if len(self.returns) >= w:
+                    old = self.returns[-w]
+                    sums[0] -= old
+                    sums[1] -= old * old
+                sums[0] += r
+                sums[1] += r * r
+            self.returns.append(r)
+        for w in MA_WINDOWS:
+            if len(self.closes) >= w:
+                self.close_sums[w] -= self.closes[-w]
+            self.close_sums[w] += close
+        self.closes.append(close)
+        self.peak = close if self.peak is None else max(self.peak, close)
+        self.last_date = date
+        self.last_close = close
+
+        row = {}
+        for w, (total, squares) in self.sums.items():
+            n = min(len(self.returns), w)
+            if n < w:
+                row[f"vol_{w}"] = None
+            else:
+                variance = max(squares - total * total / n, 0.0) / (n - 1)
+                row[f"vol_{w}"] = math.sqrt(variance * TRADING_DAYS) * 100
+        for w in MA_WINDOWS:
+            row[f"ma_{w}"] = self.close_sums[w] / w if len(self.closes) >= w else None
+        row["drawdown"] = (close / self.peak - 1) * 100
+        return row
+
+    def copy(self):
+        return RollingState.from_dict(self.to_dict())
+
+    def to_dict(self):
+        return {
+            "last_date": self.last_date,
+            "last_close": self.last_close,
+            "closes": list(self.closes),
+            "returns": list(self.returns),
+            "sums": {str(w): sums for w, sums in self.sums.items()},
+            "close_sums": {str(w): total for w, total in self.close_sums.items()},
+            "peak": self.peak,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        state.last_date = data["last_date"]
+        state.last_close = data["last_close"]
+        state.closes.extend(data["closes"])
+        state.returns.extend(data["returns"])
+        state.sums = {int(w): list(sums) for w, sums in data["sums"].items()}
+        state.close_sums = {int(w): total for w, total in data["close_sums"].items()}
+        state.peak = data["peak"]
+        return state
+
+
+def _run(state, close):
+    """close(날짜 -> 종가)를 차례로 반영. 마지막 봉은 상태에 확정하지 않고 복사본에만 반영"""
+    rows = []
+    dates = close.index.strftime("%Y-%m-%d")
+    values = close.to_numpy(dtype=float)
+    for date, value in zip(dates[:-1], values[:-1]):
+        rows.append((date, state.push(date, value)))
+    if len(values):
+        rows.append((dates[-1], state.copy().push(dates[-1], values[-1])))
+    return rows
+
+
+def update(store, symbols, rtol=1e-4):
+    """
+    저장소의 새 종가를 반영해 종목별 롤링 지표와 상태를 갱신합니다.
+    반환: 전체 이력을 다시 계산한 종목 목록
+    """
+    rebuilt = []
+    states = store.read_rolling_states(symbols)
+    for symbol in symbols:
+        data = states.get(symbol)
+        state = RollingState.from_dict(data) if data else None
+        if state is not None:
+            close = store.read_closes([symbol], start=state.last_date).get(symbol, pd.Series(dtype=float)).dropna()
+            committed = close.get(pd.Timestamp(state.last_date))
+            # 확정해 둔 봉의 값이 바뀌었으면(수정주가) 처음부터 다시 계산
+            if committed is None or abs(committed - state.last_close) > rtol * abs(state.last_close):
+                state = None
+            else:
+                close = close[close.index > pd.Timestamp(state.last_date)]
+        if state is None:
+            rebuilt.append(symbol)
+            state = RollingState()
+            close = store.read_closes([symbol]).get(symbol, pd.Series(dtype=float)).dropna()
+        if close.empty and symbol not in rebuilt:
+            continue
+        store.write_rolling(symbol, _run(state, close), state.to_dict(), replace=symbol in rebuilt)
+    return rebuilt
+
+
+def correlation(close, window=CORRELATION_WINDOW):
+    """최근 window 거래일 일간 수익률의 종목 간 상관계수 행렬 (창 구간만 계산)"""
+    returns = close.iloc[-(window + 1):].pct_change(fill_method=None).iloc[1:]
+    return returns.corr(min_periods=max(2, window // 2))
@@ -0,0 +1,266 @@
+"""
+여러 Streamlit 레플리카가 함께 쓰는 로컬 주가 서비스 (선택 사항)
+
+    python -m market.service --port 8765                    # HTTP
+    python -m market.service --socket /tmp/market.sock      # Unix 소켓
+
+서비스 프로세스 하나가 저장소, 수집, 백그라운드 갱신을 모두 맡고
+각 레플리카는 MARKET_SERVICE_URL(http://127.0.0.1:8765 또는 unix:///tmp/market.sock)을
+지정하면 ServiceClient 로 읽기만 합니다. 표 형태 응답은 Arrow IPC 스트림으로 주고받습니다.
+MARKET_SERVICE_URL 이 없거나 서비스에 연결할 수 없으면 open_store() 가 프로세스 안의
+PriceStore 를 돌려주므로 페이지는 예전처럼 직접 수집합니다.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import socket
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlencode, urlsplit
+
+import pandas as pd
+
+from market import rolling
+from market.refresher import BackgroundRefresher, fill_missing, incomplete_symbols
+from market.store import PriceStore
+
+logger = logging.getLogger(__name__)
+
+SERVICE_URL = os.environ.get("MARKET_SERVICE_URL")
+TIMEOUT = 60  # 처음 보는 종목은 서비스가 수집을 마칠 때까지 기다리므로 넉넉하게
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def to_arrow(frame):
+    """DataFrame -> Arrow IPC 스트림 바이트 (인덱스 포함)"""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def from_arrow(payload):
+    """Arrow IPC 스트림 바이트 -> DataFrame"""
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(payload).read_pandas()
+
+
+class PriceService:
+    """요청받은 종목을 저장소에 채우고 백그라운드로 계속 갱신하는 서비스 본체"""
+
+    def __init__(self, store):
+        self.store = store
+        self.refresher = BackgroundRefresher(store, [])
+
+    def start(self):
+        self.refresher.start()
+        return self
+
+    def ensure(self, symbols):
+        """저장소에 없는 종목은 받아서 채우고, 이후 갱신 대상에 추가 (반환: {종목: 오류 메시지})"""
+        # 수집은 잠금 밖에서 해야 이미 저장된 종목을 읽는 다른 요청이 기다리지 않음.
+        # 같은 종목을 여러 요청이 동시에 채우면 관문(single-flight)이 요청을 하나로 합침
+        missing = incomplete_symbols(self.store, symbols)
+        errors = {symbol: str(error) for symbol, error in fill_missing(self.store, missing) if error is not None}
+        self.refresher.track(symbols)
+        return errors
+
+    def handle(self, path, params):
+        """(content type, 본문 바이트) 를 돌려줌"""
+        symbols = [s for s in params.get("symbols", [""])[0].split(",") if s]
+        interval = params.get("interval", ["1d"])[0]
+        if path == "/health":
+            return "application/json", b'{"ok": true}'
+        if path == "/ensure":
+            return _json(self.ensure(symbols))
+        if path == "/closes":
+            self.ensure(symbols)
+            start = params.get("start", [None])[0]
+            return ARROW_TYPE, to_arrow(self.store.read_closes(symbols, interval=interval, start=start))
+        if path == "/shares":
+            self.ensure(symbols)
+            return ARROW_TYPE, to_arrow(self.store.read_shares_history(symbols))
+        if path == "/rolling":
+            self.ensure(symbols)
+            rolling.update(self.store, symbols)
+            start = params.get("start", [None])[0]
+            # (지표, 종목) 2단 열은 Arrow 로 그대로 옮길 수 없으므로 long 형식으로 보냄
+            return ARROW_TYPE, to_arrow(self.store.read_rolling(symbols, start=start).stack("symbol").reset_index())
+        if path == "/fundamentals":
+            self.ensure(symbols)
+            return _json(self.store.read_fundamentals(symbols))
+        if path == "/version":
+            return _json({
+                "last_update": self.store.last_update(symbols, interval),
+                "as_of": self.store.as_of(symbols, interval),
+            })
+        raise KeyError(path)
+
+
+def _json(value):
+    return "application/json", json.dumps(value).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None  # make_server 에서 지정
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            content_type, body = self.service.handle(url.path, parse_qs(url.query))
+        except KeyError:
+            self.send_error(404)
+            return
+        except Exception as e:
+            logger.exception("요청 처리 실패: %s", self.path)
+            self.send_error(500, str(e))
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix 소켓에서는 client_address 가 빈 문자열
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, host="127.0.0.1", port=8765, socket_path=None):
+    handler = type("Handler", (_Handler,), {"service": service})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        return _UnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class ServiceClient:
+    """
+    PriceStore 와 같은 읽기 메서드를 가진 서비스 클라이언트.
+    수집과 갱신은 서비스가 맡으므로 stale/missing 조회는 항상 빈 목록을 돌려주고,
+    읽기 요청을 받은 서비스가 필요한 종목을 먼저 채운 뒤 응답합니다.
+    """
+
+    def __init__(self, url=SERVICE_URL, timeout=TIMEOUT):
+        self.url = urlsplit(url)
+        self.timeout = timeout
+
+    def _connection(self):
+        if self.url.scheme == "unix":
+            return _UnixHTTPConnection(self.url.path, self.timeout)
+        return http.client.HTTPConnection(self.url.hostname, self.url.port or 80, timeout=self.timeout)
+
+    def _get(self, path, **params):
+        query = urlencode({key: value for key, value in params.items() if value is not None}, quote_via=quote)
+        conn = self._connection()
+        try:
+            conn.request("GET", f"{path}?{query}")
+            response = conn.getresponse()
+            body = response.read()
+        finally:
+            conn.close()
+        if response.status != 200:
+            raise RuntimeError(f"주가 서비스 오류 {response.status}: {path}")
+        return body
+
+    def _get_json(self, path, **params):
+        return json.loads(self._get(path, **params))
+
+    def health(self):
+        return self._get_json("/health").get("ok", False)
+
+    def ensure(self, symbols):
+        return self._get_json("/ensure", symbols=",".join(symbols))
+
+    def stale_symbols(self, symbols, interval="1d", ttl=None):
+        return []
+
+    def missing_symbols(self, symbols, interval="1d"):
+        return []
+
+    def stale_fundamentals(self, symbols, ttl=None):
+        return []
+
+    def as_of(self, symbols, interval="1d"):
+        return self._get_json("/version", symbols=",".join(symbols), interval=interval)["as_of"]
+
+    def last_update(self, symbols, interval="1d"):
+        return self._get_json("/version", symbols=",".join(symbols), interval=interval)["last_update"]
+
+    def read_closes(self, symbols, interval="1d", start=None):
+        if start is not None:
+            start = pd.Timestamp(start).strftime("%Y-%m-%d")
+        return from_arrow(self._get("/closes", symbols=",".join(symbols), interval=interval, start=start))
+
+    def read_fundamentals(self, symbols):
+        return self._get_json("/fundamentals", symbols=",".join(symbols))
+
+    def read_shares_history(self, symbols):
+        return from_arrow(self._get("/shares", symbols=",".join(symbols)))
+
+    def read_rolling(self, symbols, start=None):
+        """롤링 지표 (서비스가 새 봉을 먼저 반영한 뒤 응답)"""
+        if start is not None:
+            start = pd.Timestamp(start).strftime("%Y-%m-%d")
+        long = from_arrow(self._get("/rolling", symbols=",".join(symbols), start=start))
+        return long.pivot(index="Date", columns="symbol").sort_index()
+
+
+def open_store(url=SERVICE_URL):
+    """서비스가 설정되어 있고 응답하면 ServiceClient, 아니면 프로세스 안의 PriceStore"""
+    if url:
+        client = ServiceClient(url)
+        try:
+            if client.health():
+                return client
+        except OSError as e:
+            logger.warning("주가 서비스(%s)에 연결할 수 없어 직접 수집합니다: %s", url, e)
+    return PriceStore()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="여러 레플리카가 함께 쓰는 로컬 주가 서비스")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", default=None, help="Unix 소켓 경로 (지정하면 TCP 대신 사용)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    service = PriceService(PriceStore()).start()
+    server = make_server(service, args.host, args.port, args.socket)
+    logger.info("주가 서비스 시작: %s", args.socket or f"http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+대시보드 데이터 스냅샷 (Arrow/Parquet 내보내기)
+
+03 페이지가 보여 주는 종가/시가총액 시계열과 기업별 지표를 저장소에서 계산해
+데이터 기준 시각으로 이름 붙인 파일 두 개로 내보냅니다. 노트북이나 보고서는
+Streamlit 페이지를 돌리거나 Yahoo 에 직접 요청하지 않고 이 파일만 읽으면 됩니다.
+
+    python -m market.snapshot top10                 # .cache/snapshots/top10-<기준시각>-prices.arrow, -metrics.arrow
+    python -m market.snapshot top10 --format parquet
+
+    prices:  (Date, Company, Symbol, Close, Market Cap (T$)) long 형식, 값은 보고 통화(기본 USD) float32
+             (시가총액 열 이름은 보고 통화에 따라 analytics.MARKET_CAP)
+    metrics: 03 페이지 순위/수익률 표와 같은 기업별 지표
+
+Arrow 는 IPC 파일 형식(무압축)이라 pyarrow.memory_map 으로 복사 없이 읽을 수 있고,
+Parquet 은 크기가 작아 보관/전송에 알맞습니다. 파일 메타데이터에 유니버스와 기준 시각이 들어갑니다.
+"""
+import argparse
+import io
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import instrumentation
+from market import currency, rolling
+from market.analytics import MARKET_CAP, compute_metrics, market_cap_matrix, shares_outstanding
+from market.files import write_bytes_atomic
+from market.universe import as_dict, load_universe
+
+SNAPSHOT_DIR = os.environ.get(
+    "MARKET_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "snapshots"),
+)
+# 형식 -> (파일 확장자, MIME 타입)
+FORMATS = {
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+# 블록 필드 -> 저장소 롤링 지표 열
+ROLLING_FIELDS = {
+    'Vol_30': 'vol_30', 'Vol_90': 'vol_90', 'Vol_252': 'vol_252',
+    'MA_50': 'ma_50', 'MA_200': 'ma_200', 'Drawdown': 'drawdown',
+}
+
+
+def load_dashboard(store, universe, years=3, with_rolling=True):
+    """
+    저장소에서 03 페이지에 쓰는 데이터를 계산합니다 (수집은 하지 않음).
+    universe: load_universe 결과. 가격은 보고 통화로 환산하고 보고 달력의 거래일로 맞춥니다.
+
+    반환: (필드 -> 날짜 x 기업 DataFrame, 기업별 지표 DataFrame)
+        필드는 'Close', 'Market_Cap' 과 ROLLING_FIELDS (PriceBlock.from_frames 에 그대로 넘길 수 있음)
+        with_rolling=False 이면 롤링 지표는 갱신/계산하지 않고 'Close', 'Market_Cap' 만 돌려줌
+    """
+    from market.service import ServiceClient
+
+    companies = as_dict(universe)
+    symbol_to_company = {symbol: company for company, symbol in companies.items()}
+    currencies = universe.set_index("symbol")["currency"]
+    start = datetime.now() - timedelta(days=365 * years)
+    with instrumentation.span("store:read"):
+        closes = store.read_closes(symbol_to_company, start=start)
+        fx = store.read_closes(currency.fx_symbols(currencies), start=start - timedelta(days=14))
+        fundamentals = store.read_fundamentals(symbol_to_company)
+        shares_history = store.read_shares_history(symbol_to_company)
+
+    # 주가와 발행주식수가 모두 있는 기업만 사용
+    symbols = [symbol for symbol in closes.columns if symbol in fundamentals]
+    with instrumentation.span("currency:normalize"):
+        closes = currency.normalize(closes[symbols], currencies, fx).dropna(how="all")
+    current_shares = pd.Series({symbol: shares_outstanding(fundamentals[symbol]) for symbol in symbols}, dtype=float)
+
+    market_caps = market_cap_matrix(closes, shares_history, current_shares)
+    metrics = compute_metrics(closes.rename(columns=symbol_to_company), current_shares.rename(symbol_to_company))
+    metrics.insert(0, 'Symbol', pd.Series(companies))
+    frames = {
+        'Close': closes.rename(columns=symbol_to_company),
+        'Market_Cap': market_caps.rename(columns=symbol_to_company),
+    }
+    if not with_rolling:
+        return frames, metrics
+
+    # 롤링 지표는 저장소에 보관한 상태에서 새 봉만 이어서 계산 (주가 서비스를 쓰면 서비스가 계산)
+    if not isinstance(store, ServiceClient):
+        with instrumentation.span("rolling:update"):
+            rolling.update(store, symbols)
+    with instrumentation.span("store:read_rolling"):
+        indicators = store.read_rolling(symbols, start=closes.index.min()) if len(closes) else pd.DataFrame()
+    # 변동성/낙폭은 현지 통화 기준 그대로, 이동평균은 종가와 같은 날의 환율로 환산해 같은 날짜 축에 맞춤
+    for field, column in ROLLING_FIELDS.items():
+        if column in indicators.columns.get_level_values(0):
+            frame = currency.asof(indicators[column], closes.index)
+            if field.startswith('MA_'):
+                frame = currency.convert(frame, currencies, fx)
+            frames[field] = frame.rename(columns=symbol_to_company)
+    if 'Drawdown' in frames:
+        metrics['Volatility 90D (%)'] = frames['Vol_90'].ffill().iloc[-1]
+        metrics['Max Drawdown (%)'] = frames['Drawdown'].min()
+    return frames, metrics
+
+
+def snapshot_tables(close, market_cap, metrics):
+    """
+    날짜 x 기업 종가/시가총액과 지표 표를 내보낼 두 표로 바꿈.
+    반환: {'prices': long 형식 DataFrame, 'metrics': 기업별 지표 DataFrame}
+    """
+    prices = pd.concat({'Close': close, MARKET_CAP: market_cap}, axis=1).stack(1).dropna(how="all")
+    prices = prices.astype("float32").rename_axis(['Date', 'Company']).reset_index()
+    prices.insert(2, 'Symbol', prices['Company'].map(metrics['Symbol']))
+    prices['Company'] = pd.Categorical(prices['Company'], categories=list(close.columns))
+    prices['Symbol'] = prices['Symbol'].astype("category")
+    return {'prices': prices, 'metrics': metrics.reset_index()}
+
+
+def version_stamp(as_of):
+    """데이터 기준 시각(epoch 초) -> 파일 이름에 쓰는 'YYYYMMDDTHHMMSS'"""
+    return datetime.fromtimestamp(as_of or 0).strftime("%Y%m%dT%H%M%S")
+
+
+def to_bytes(frame, fmt="arrow", metadata=None):
+    """DataFrame -> Arrow IPC 파일 또는 Parquet 바이트 (metadata 는 스키마 메타데이터로 기록)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    if metadata:
+        table = table.replace_schema_metadata({**table.schema.metadata, **metadata})
+    sink = io.BytesIO()
+    if fmt == "parquet":
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
+
+
+def snapshot_name(universe_name, as_of, table, fmt="arrow"):
+    return f"{universe_name}-{version_stamp(as_of)}-{table}.{FORMATS[fmt][0]}"
+
+
+def write_snapshot(tables, universe_name, as_of, fmt="arrow", output_dir=SNAPSHOT_DIR):
+    """표마다 파일 하나씩 기록하고 경로 목록을 돌려줌 (같은 기준 시각의 파일이 있으면 교체)"""
+    metadata = {"universe": universe_name, "as_of": datetime.fromtimestamp(as_of or 0).isoformat()}
+    paths = []
+    for table, frame in tables.items():
+        path = os.path.join(output_dir, snapshot_name(universe_name, as_of, table, fmt))
+        paths.append(write_bytes_atomic(path, to_bytes(frame, fmt, {**metadata, "table": table})))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="저장소를 채우고 대시보드 데이터 스냅샷을 내보냄")
+    parser.add_argument("universe", nargs="?", default="top10", help="data/universes 의 유니버스 이름")
+    parser.add_argument("--format", choices=list(FORMATS), default="arrow")
+    parser.add_argument("--output", default=SNAPSHOT_DIR, help="출력 폴더 (기본: MARKET_SNAPSHOT_DIR)")
+    parser.add_argument("--years", type=int, default=3)
+    args = parser.parse_args()
+
+    from market.refresher import refresh_universe
+    from market.service import open_store
+
+    store = open_store()
+    universe = load_universe(args.universe)
+    for symbol, error in refresh_universe(store, universe):
+        if error is not None:
+            print(f"{symbol} 수집 실패: {error}")
+
+    frames, metrics = load_dashboard(store, universe, args.years)
+    tables = snapshot_tables(frames['Close'], frames['Market_Cap'], metrics)
+    for path in write_snapshot(tables, args.universe, store.as_of(list(universe["symbol"])), args.format, args.output):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+여러 프로세스가 함께 쓰는 로컬 주가 저장소 (SQLite)
+
+(종목, 주기, 날짜) 를 키로 종가를 저장하고, 종목별로 마지막 수집 시각을 기록해
+TTL 이 지난 종목만 다시 가져오게 합니다. WAL 모드와 busy timeout 을 켜서
+여러 Streamlit 프로세스/레플리카가 같은 파일을 동시에 읽고 쓸 수 있습니다.
+"""
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+DEFAULT_PATH = os.environ.get(
+    "MARKET_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "market.sqlite"),
+)
+DEFAULT_TTL = 3600  # 1시간
+FUNDAMENTALS_TTL = 7 * 24 * 3600  # 발행주식수는 분기마다 바뀌므로 1주일
+# 증분 갱신 시 다시 받아 비교하는 최근 구간 (배당/분할로 인한 수정주가 감지용)
+REVALIDATE_DAYS = 10
+# 수집에 실패한 종목을 다시 시도하기까지의 대기(초). 실패할 때마다 두 배, 최대 DEFAULT_TTL
+FAILURE_BACKOFF = 300
+FUNDAMENTALS = "fundamentals"  # fetch_failures 의 kind (주가는 interval 을 그대로 씀)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    symbol   TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    date     TEXT NOT NULL,
+    close    REAL,
+    PRIMARY KEY (symbol, interval, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fetch_log (
+    symbol     TEXT NOT NULL,
+    interval   TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (symbol, interval)
+);
+CREATE TABLE IF NOT EXISTS fetch_failures (
+    symbol    TEXT NOT NULL,
+    kind      TEXT NOT NULL,
+    attempts  INTEGER NOT NULL,
+    failed_at REAL NOT NULL,
+    retry_at  REAL NOT NULL,
+    PRIMARY KEY (symbol, kind)
+);
+CREATE TABLE IF NOT EXISTS fundamentals (
+    symbol                     TEXT PRIMARY KEY,
+    shares_outstanding         REAL,
+    implied_shares_outstanding REAL,
+    fetched_at                 REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shares_history (
+    symbol TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    shares REAL NOT NULL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rolling_state (
+    symbol     TEXT PRIMARY KEY,
+    state      TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rolling (
+    symbol   TEXT NOT NULL,
+    date     TEXT NOT NULL,
+    vol_30   REAL,
+    vol_90   REAL,
+    vol_252  REAL,
+    ma_50    REAL,
+    ma_200   REAL,
+    drawdown REAL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+"""
+
+
+def _to_dates(index):
+    """시간대가 붙은 DatetimeIndex 를 'YYYY-MM-DD' 문자열로 변환"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.strftime("%Y-%m-%d")
+
+
+class PriceStore:
+    """종목/날짜 단위 종가 저장소"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """트랜잭션 하나를 여는 연결 (끝나면 커밋 후 닫힘)"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def stale_symbols(self, symbols, interval="1d", ttl=DEFAULT_TTL):
+        """저장된 적이 없거나 TTL 이 지난 종목 목록"""
+        symbols = list(symbols)
+        deadline = time.time() - ttl
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT symbol, fetched_at FROM fetch_log WHERE interval = ? "
+                f"AND symbol IN ({','.join('?' * len(symbols))})",
+                [interval, *symbols],
+            ).fetchall()
+        fresh = {symbol for symbol, fetched_at in rows if fetched_at >= deadline}
+        return [symbol for symbol in symbols if symbol not in fresh]
+
+    def missing_symbols(self, symbols, interval="1d"):
+        """한 번도 수집된 적이 없는 종목 목록"""
+        return self.stale_symbols(symbols, interval, ttl=float("inf"))
+
+    def as_of(self, symbols, interval="1d"):
+        """주어진 종목들 중 가장 오래된 수집 시각 (epoch 초, 없으면 None)"""
+        return self._fetch_time("MIN", symbols, interval)
+
+    def last_update(self, symbols, interval="1d"):
+        """
+        주어진 종목들의 주가/발행주식수 중 가장 최근 수집 시각.
+        하나라도 갱신되면 바뀌므로 캐시 키로 사용합니다.
+        """
+        symbols = list(symbols)
+        placeholders = ','.join('?' * len(symbols))
+        with self._connect() as conn:
+            (fetched_at,) = conn.execute(
+                f"SELECT MAX(fetched_at) FROM ("
+                f"SELECT fetched_at FROM fetch_log WHERE interval = ? AND symbol IN ({placeholders}) "
+                f"UNION ALL SELECT fetched_at FROM fundamentals WHERE symbol IN ({placeholders}))",
+                [interval, *symbols, *symbols],
+            ).fetchone()
+        return fetched_at
+
+    def _fetch_time(self, aggregate, symbols, interval):
+        symbols = list(symbols)
+        with self._connect() as conn:
+            (fetched_at,) = conn.execute(
+                f"SELECT {aggregate}(fetched_at) FROM fetch_log WHERE interval = ? "
+                f"AND symbol IN ({','.join('?' * len(symbols))})",
+                [interval, *symbols],
+            ).fetchone()
+        return fetched_at
+
+    def delta_starts(self, symbols, interval="1d", revalidate_days=REVALIDATE_DAYS):
+        """
+        이미 이력이 있는 종목별로 증분 수집을 시작할 날짜를 돌려줍니다.
+        마지막 저장일보다 revalidate_days 만큼 앞에서 시작해 겹치는 구간을 재검증합니다.
+        """
+        symbols = list(symbols)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT symbol, MAX(date) FROM prices WHERE interval = ? "
+                f"AND symbol IN ({','.join('?' * len(symbols))}) GROUP BY symbol",
+                [interval, *symbols],
+            ).fetchall()
+        offset = pd.Timedelta(days=revalidate_days)
+        return {symbol: pd.Timestamp(last) - offset for symbol, last in rows}
+
+    def write_closes(self, symbol, close, interval="1d", replace=True):
+        """
+        한 종목의 종가 Series 를 저장하고 수집 시각을 기록.
+        replace=True 면 기존 이력을 지우고 통째로 바꾸며, False 면 같은 날짜만 덮어씁니다.
+        """
+        close = close.dropna()
+        rows = zip([symbol] * len(close), [interval] * len(close), _to_dates(close.index), close.astype(float))
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if replace:
+                conn.execute("DELETE FROM prices WHERE symbol = ? AND interval = ?", (symbol, interval))
+            conn.executemany("INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?)", rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO fetch_log VALUES (?, ?, ?)",
+                (symbol, interval, time.time()),
+            )
+            conn.execute("DELETE FROM fetch_failures WHERE symbol = ? AND kind = ?", (symbol, interval))
+
+    def merge_closes(self, symbol, close, interval="1d", rtol=1e-4):
+        """
+        증분으로 받은 종가를 기존 이력에 덧붙입니다.
+        겹치는 날짜의 값이 저장된 값과 다르면(수정주가 반영) 아무것도 쓰지 않고
+        False 를 돌려주므로, 호출하는 쪽에서 전체 이력을 다시 받아야 합니다.
+        """
+        close = close.dropna()
+        if close.empty:
+            self.touch(symbol, interval)
+            return True
+        dates = _to_dates(close.index)
+        with self._connect() as conn:
+            stored = dict(conn.execute(
+                "SELECT date, close FROM prices WHERE symbol = ? AND interval = ? AND date >= ?",
+                (symbol, interval, dates.min()),
+            ).fetchall())
+
+        # 가장 최근 저장 값은 장중 미완성 봉일 수 있으므로 비교에서 제외
+        last_stored = max(stored) if stored else None
+        for date, value in zip(dates, close.astype(float)):
+            if date in stored and date != last_stored and abs(value - stored[date]) > rtol * abs(stored[date]):
+                return False
+
+        self.write_closes(symbol, close, interval, replace=False)
+        return True
+
+    def touch(self, symbol, interval="1d"):
+        """새 데이터가 없어도 수집 시각만 갱신"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fetch_log VALUES (?, ?, ?)",
+                (symbol, interval, time.time()),
+            )
+            conn.execute("DELETE FROM fetch_failures WHERE symbol = ? AND kind = ?", (symbol, interval))
+
+    def record_failure(self, symbol, kind="1d", backoff=FAILURE_BACKOFF):
+        """
+        수집 실패를 기록하고 다음 재시도 시각을 정함 (kind: 주가는 interval, 발행주식수는 FUNDAMENTALS).
+        성공해서 값을 쓰면 기록이 지워집니다.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT attempts FROM fetch_failures WHERE symbol = ? AND kind = ?", (symbol, kind)
+            ).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            delay = min(backoff * 2 ** (attempts - 1), DEFAULT_TTL)
+            conn.execute(
+                "INSERT OR REPLACE INTO fetch_failures VALUES (?, ?, ?, ?, ?)",
+                (symbol, kind, attempts, now, now + delay),
+            )
+
+    def failed_symbols(self, symbols, kind="1d", waiting=False):
+        """수집에 실패한 적이 있는 종목 목록 (waiting=True 면 아직 재시도 시각이 되지 않은 종목만)"""
+        symbols = list(symbols)
+        if not symbols:
+            return []
+        query = (
+            f"SELECT symbol FROM fetch_failures WHERE kind = ? "
+            f"AND symbol IN ({','.join('?' * len(symbols))})"
+        )
+        params = [kind, *symbols]
+        if waiting:
+            query += " AND retry_at > ?"
+            params.append(time.time())
+        with self._connect() as conn:
+            failed = {symbol for (symbol,) in conn.execute(query, params).fetchall()}
+        return [symbol for symbol in symbols if symbol in failed]
+
+    def read_closes(self, symbols, interval="1d", start=None):
+        """종목별 종가를 날짜 x 종목 형태의 DataFrame 으로 읽기"""
+        symbols = list(symbols)
+        query = (
+            f"SELECT date, symbol, close FROM prices WHERE interval = ? "
+            f"AND symbol IN ({','.join('?' * len(symbols))})"
+        )
+        params = [interval, *symbols]
+        if start is not None:
+            query += " AND date >= ?"
+            params.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+        with self._connect() as conn:
+            long = pd.read_sql_query(query, conn, params=params)
+        wide = long.pivot(index="date", columns="symbol", values="close")
+        wide.index = pd.to_datetime(wide.index)
+        wide.index.name = "Date"
+        return wide.reindex(columns=[s for s in symbols if s in wide.columns]).sort_index()
+
+    def stale_fundamentals(self, symbols, ttl=FUNDAMENTALS_TTL):
+        """발행주식수 정보가 없거나 TTL 이 지난 종목 목록"""
+        symbols = list(symbols)
+        deadline = time.time() - ttl
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT symbol FROM fundamentals WHERE fetched_at >= ? "
+                f"AND symbol IN ({','.join('?' * len(symbols))})",
+                [deadline, *symbols],
+            ).fetchall()
+        fresh = {symbol for (symbol,) in rows}
+        return [symbol for symbol in symbols if symbol not in fresh]
+
+    def write_fundamentals(self, symbol, fields, shares):
+        """현재 발행주식수 필드와 발행주식수 이력(Series)을 통째로 교체"""
+        shares = shares.dropna()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO fundamentals VALUES (?, ?, ?, ?)",
+                (symbol, fields.get('sharesOutstanding'), fields.get('impliedSharesOutstanding'), time.time()),
+            )
+            conn.execute("DELETE FROM shares_history WHERE symbol = ?", (symbol,))
+            conn.execute("DELETE FROM fetch_failures WHERE symbol = ? AND kind = ?", (symbol, FUNDAMENTALS))
+            conn.executemany(
+                "INSERT INTO shares_history VALUES (?, ?, ?)",
+                zip([symbol] * len(shares), _to_dates(shares.index), shares.astype(float)),
+            )
+
+    def read_fundamentals(self, symbols):
+        """{종목: {'sharesOutstanding': ..., 'impliedSharesOutstanding': ...}} (값이 없으면 키 생략)"""
+        symbols = list(symbols)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT symbol, shares_outstanding, implied_shares_outstanding FROM fundamentals "
+                f"WHERE symbol IN ({','.join('?' * len(symbols))})",
+                symbols,
+            ).fetchall()
+        return {
+            symbol: {
+                key: value
+                for key, value in (('sharesOutstanding', shares), ('impliedSharesOutstanding', implied))
+                if value is not None
+            }
+            for symbol, shares, implied in rows
+        }
+
+    def read_shares_history(self, symbols):
+        """발행주식수 이력을 날짜 x 종목 형태의 DataFrame 으로 읽기"""
+        symbols = list(symbols)
+        with self._connect() as conn:
+            long = pd.read_sql_query(
+                f"SELECT date, symbol, shares FROM shares_history "
+                f"WHERE symbol IN ({','.join('?' * len(symbols))})",
+                conn,
+                params=symbols,
+            )
+        wide = long.pivot(index="date", columns="symbol", values="shares")
+        wide.index = pd.to_datetime(wide.index)
+        wide.index.name = "Date"
+        return wide.sort_index()
+
+    def read_rolling_states(self, symbols):
+        """{종목: 롤링 계산 상태 dict} (저장된 적 없는 종목은 생략)"""
+        symbols = list(symbols)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT symbol, state FROM rolling_state "
+                f"WHERE symbol IN ({','.join('?' * len(symbols))})",
+                symbols,
+            ).fetchall()
+        return {symbol: json.loads(state) for symbol, state in rows}
+
+    def write_rolling(self, symbol, rows, state, replace=False):
+        """
+        한 종목의 롤링 지표 행 [(날짜, {지표: 값})] 과 계산 상태를 함께 저장.
+        replace=True 면 기존 지표를 지우고 통째로 바꾸며, False 면 같은 날짜만 덮어씁니다.
+        """
+        columns = ("vol_30", "vol_90", "vol_252", "ma_50", "ma_200", "drawdown")
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if replace:
+                conn.execute("DELETE FROM rolling WHERE symbol = ?", (symbol,))
+            conn.executemany(
+                f"INSERT OR REPLACE INTO rolling VALUES (?, ?{', ?' * len(columns)})",
+                [(symbol, date, *(values[c] for c in columns)) for date, values in rows],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO rolling_state VALUES (?, ?, ?)",
+                (symbol, json.dumps(state), time.time()),
+            )
+
+    def read_rolling(self, symbols, start=None):
+        """롤링 지표를 날짜 x (지표, 종목) 형태의 DataFrame 으로 읽기"""
+        symbols = list(symbols)
+        query = f"SELECT * FROM rolling WHERE symbol IN ({','.join('?' * len(symbols))})"
+        params = symbols
+        if start is not None:
+            query += " AND date >= ?"
+            params = [*symbols, pd.Timestamp(start).strftime("%Y-%m-%d")]
+        with self._connect() as conn:
+            long = pd.read_sql_query(query, conn, params=params)
+        wide = long.pivot(index="date", columns="symbol").sort_index()
+        wide.index = pd.to_datetime(wide.index)
+        wide.index.name = "Date"
+        return wide
@@ -0,0 +1,61 @@
+"""
+종목 유니버스(추적 대상 목록) 정의와 스크리너
+
+유니버스는 data/universes/<이름>.csv 파일(name, symbol, sector, exchange, currency, calendar)로 관리하며,
+MARKET_UNIVERSE_DIR 환경 변수로 다른 폴더를 지정할 수 있습니다.
+currency/calendar 가 비어 있으면 티커 접미사로 채웁니다 (market.currency.listing).
+수백~수천 종목이어도 필터링/상위 N 선택/페이지 나누기는 서버에서 끝내고
+화면에는 필요한 행만 보냅니다.
+"""
+import math
+import os
+
+import pandas as pd
+
+from market.analytics import MARKET_CAP
+from market.currency import tag
+
+UNIVERSE_DIR = os.environ.get(
+    "MARKET_UNIVERSE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "universes"),
+)
+
+
+def load_universe(name):
+    """유니버스 CSV 를 읽어 name 을 인덱스로 하는 DataFrame 으로 반환"""
+    universe = pd.read_csv(os.path.join(UNIVERSE_DIR, f"{name}.csv"), dtype=str)
+    return tag(universe.drop_duplicates("symbol").set_index("name"))
+
+
+def as_dict(universe):
+    """{기업명: 티커} 딕셔너리"""
+    return universe["symbol"].to_dict()
+
+
+def screen(metrics, universe, sectors=None, exchanges=None, min_market_cap=None, top_n=None):
+    """
+    지표 표에 스크리너 조건을 적용하고 시가총액 순으로 정렬합니다.
+    조건이 None 이거나 비어 있으면 그 조건은 건너뜁니다.
+    """
+    screened = metrics.join(universe[["sector", "exchange"]], how="left")
+    if sectors:
+        screened = screened[screened["sector"].isin(sectors)]
+    if exchanges:
+        screened = screened[screened["exchange"].isin(exchanges)]
+    if min_market_cap:
+        screened = screened[screened[MARKET_CAP] >= min_market_cap]
+    screened = screened.sort_values(MARKET_CAP, ascending=False)
+    if top_n:
+        screened = screened.head(top_n)
+    return screened
+
+
+def page_count(n_rows, page_size):
+    """n_rows 개 행을 page_size 씩 나눴을 때의 페이지 수 (최소 1)"""
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def paginate(df, page, page_size):
+    """1부터 시작하는 page 번호에 해당하는 행만 잘라서 반환"""
+    page = min(max(1, page), page_count(len(df), page_size))
+    return df.iloc[(page - 1) * page_size:page * page_size]
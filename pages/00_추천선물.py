@@ -1,62 +1,35 @@
 import streamlit as st
 
+import instrumentation
+import prewarm
+from recommend import MBTI_TYPES, recommend
+
 # 페이지 설정
 st.set_page_config(page_title="🎁 MBTI 선물 추천기", page_icon="🎈", layout="wide")
 
+# 다른 페이지에서 쓰는 무거운 모듈은 백그라운드에서 미리 불러옴
+prewarm.start()
+
 # 제목
 st.title("🎁 MBTI 성격별 맞춤 선물 추천!")
 st.markdown("MBTI를 선택하면, 그 사람에게 딱 맞는 센스 있는 선물을 3가지 추천해드릴게요! 😊")
 
 # MBTI 선택
-mbti_list = [
-    "INTJ", "INTP", "ENTJ", "ENTP",
-    "INFJ", "INFP", "ENFJ", "ENFP",
-    "ISTJ", "ISFJ", "ESTJ", "ESFJ",
-    "ISTP", "ISFP", "ESTP", "ESFP"
-]
-mbti = st.selectbox("📌 선물 받을 사람의 MBTI는?", mbti_list)
-
-# 선물 추천 함수
-def recommend_gifts(mbti_type):
-    gifts = {
-        "INTJ": [
-            ("📚 프리미엄 하드커버 노트북", "아이디어 정리와 계획을 좋아하는 INTJ에게는 고급 노트북이 제격이에요."),
-            ("⌚ 심플한 스마트워치", "효율을 중요하게 여기는 성격이라 기능성과 디자인을 모두 갖춘 시계를 선호해요."),
-            ("🧠 미스터리 추리소설 세트", "혼자 조용히 생각하며 몰입할 수 있는 지적인 책 선물은 언제나 환영입니다.")
-        ],
-        "ENFP": [
-            ("🎨 감성적인 핸드메이드 다이어리", "자신만의 세계를 표현할 수 있는 따뜻한 디자인의 다이어리가 좋아요."),
-            ("🎧 무선 이어폰", "음악을 들으며 에너지를 충전하는 ENFP에게 꼭 필요한 아이템!"),
-            ("🌍 여행용 미니백팩", "새로운 것을 탐험하는 걸 좋아하니 가볍고 감각적인 여행 가방이 잘 어울려요.")
-        ],
-        "ISFJ": [
-            ("🕯️ 향기 좋은 캔들 세트", "잔잔하고 편안한 분위기를 좋아하니 향초는 최고의 힐링 선물이에요."),
-            ("📷 감성 폴라로이드 카메라", "추억을 소중히 여기는 성향이라, 사진을 찍고 간직하는 걸 좋아해요."),
-            ("🧣 고급 니트 머플러", "소중한 사람의 체온과 마음을 챙겨주는 따뜻한 아이템이에요.")
-        ],
-        "ENTP": [
-            ("🎮 창의력 자극 보드게임", "논리와 상상을 함께 자극하는 두뇌 싸움, ENTP에게 딱이죠!"),
-            ("📱 휴대용 짐벌(영상 촬영기기)", "자신을 표현하고 기록하는 것을 좋아해요. 영상 제작도 즐거운 놀이가 될 수 있어요."),
-            ("🚀 독특한 디자인의 데스크 장식", "톡톡 튀는 개성! 사무실이나 방에서 자신만의 공간을 표현하길 좋아해요.")
-        ],
-    }
-    # 기본 선물
-    default = [
-        ("🎁 정성 담긴 손편지와 꽃", "어떤 성격이든 진심이 담긴 선물은 마음을 따뜻하게 만들어줍니다."),
-        ("☕ 따뜻한 텀블러", "언제 어디서든 따뜻함을 간직할 수 있어요."),
-        ("🎂 맞춤형 케이크", "기념일을 축하하며 나만을 위한 케이크는 특별한 감동을 줍니다.")
-    ]
-    return gifts.get(mbti_type, default)
+mbti = st.selectbox("📌 선물 받을 사람의 MBTI는?", MBTI_TYPES)
 
 # 결과 출력
 if mbti:
-    gift_list = recommend_gifts(mbti)
+    # 선물 목록과 유형별 추천 순위는 data/catalogs/gifts.json 에서 (recommend 모듈 참고)
+    with instrumentation.span("gifts:recommend_gifts"):
+        gift_list = recommend("gifts", mbti, k=3)
     st.balloons()
     st.subheader(f"💝 {mbti} 유형에게 어울리는 선물 추천 3가지!")
-    for idx, (name, desc) in enumerate(gift_list, 1):
-        st.markdown(f"### {idx}. {name}")
-        st.markdown(f"📝 {desc}")
+    for idx, gift in enumerate(gift_list, 1):
+        st.markdown(f"### {idx}. {gift['name']}")
+        st.markdown(f"📝 {gift['desc']}")
         st.markdown("---")
 
 # 푸터
 st.caption("💡 MBTI는 참고용! 선물은 마음에서 시작된다는 걸 잊지 마세요 🌷")
+
+instrumentation.debug_panel()
@@ -1,36 +1,83 @@
+import os
+
 import streamlit as st
-import folium
-from streamlit_folium import st_folium
+
+import instrumentation
+import prewarm
 
 # 페이지 설정
 st.set_page_config(page_title="🇰🇷 한국인이 사랑한 Top 10 여행지", layout="wide")
+
+# 다른 페이지에서 쓰는 무거운 모듈은 백그라운드에서 미리 불러옴
+prewarm.start()
+
 st.title("💖 한국인이 가장 사랑하는 Top 10 여행지")
 st.markdown("한국인의 마음을 사로잡은 여행지들을 소개합니다! 하트를 눌러 사랑을 표현해보세요 💌")
 
-# 여행지 정보 (좌표 + 설명)
-locations = [
-    {"name": "서울", "lat": 37.5665, "lon": 126.9780, "desc": "과거와 현재가 공존하는 도시, 쇼핑과 먹거리가 가득!"},
-    {"name": "부산", "lat": 35.1796, "lon": 129.0756, "desc": "해운대와 광안리, 그리고 맛있는 회까지! 바다의 매력 도시 💙"},
-    {"name": "제주도", "lat": 33.4996, "lon": 126.5312, "desc": "한국의 하와이 🌴 감귤향 가득한 힐링 섬"},
-    {"name": "경주", "lat": 35.8562, "lon": 129.2247, "desc": "천년의 고도, 유네스코 문화유산이 가득한 역사 도시"},
-    {"name": "강릉", "lat": 37.7519, "lon": 128.8761, "desc": "바다와 커피, 그리고 감성 가득한 카페 거리 🌊☕"},
-    {"name": "속초", "lat": 38.2049, "lon": 128.5912, "desc": "설악산과 바다, 자연을 모두 느낄 수 있는 도시 🌲"},
-    {"name": "전주", "lat": 35.8242, "lon": 127.1479, "desc": "한옥마을과 전주비빔밥의 도시, 전통과 맛의 향연 🍱"},
-    {"name": "인천", "lat": 37.4563, "lon": 126.7052, "desc": "차이나타운과 월미도의 도시, 공항도 있는 관문 도시 ✈️"},
-    {"name": "여수", "lat": 34.7604, "lon": 127.6622, "desc": "밤바다의 도시 🎶 낭만 가득한 남해 여행지"},
-    {"name": "남이섬", "lat": 37.7902, "lon": 127.5252, "desc": "사계절 내내 아름다운 섬, 드라마 명소 🌸❄️"}
-]
-
-# Folium 지도 생성
-m = folium.Map(location=[36.5, 127.8], zoom_start=7, tiles="CartoDB positron")
-
-# 마커 추가
-for loc in locations:
-    folium.Marker(
-        location=[loc["lat"], loc["lon"]],
-        popup=f"<b>{loc['name']}</b><br>{loc['desc']}",
-        icon=folium.Icon(color="pink", icon="heart", prefix="fa"),
-    ).add_to(m)
+# 여행지 정보 (좌표 + 설명)는 data/places/<이름>.csv (name, lat, lon, desc) 에서 읽음
+PLACES_FILE = os.environ.get(
+    "MAP_PLACES_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "places", "korea_top10.csv"),
+)
+# 지도 표시 방식: static(기본) 은 미리 만든 HTML 을 그대로 보내 이동/확대할 때 서버가 다시 실행되지 않고,
+# interactive 는 st_folium 으로 그리되 returned_objects=[] 로 지도 상태를 돌려받지 않음
+MAP_MODE = os.environ.get("MAP_MODE", "static")
+FAST_CLUSTER_MIN = 1000  # 이보다 많으면 마커를 JS 에서 만드는 FastMarkerCluster 사용
+MAP_HEIGHT = 600
+
+
+def build_map(path):
+    """여행지 파일로 클러스터 마커가 있는 folium 지도를 만듦"""
+    import folium
+    import pandas as pd
+    from folium.plugins import FastMarkerCluster, MarkerCluster
+
+    places = pd.read_csv(path)
+    m = folium.Map(location=[36.5, 127.8], zoom_start=7, tiles="CartoDB positron")
+    if len(places) >= FAST_CLUSTER_MIN:
+        # 수천 개는 좌표와 팝업 문자열만 배열로 넘기고 브라우저에서 마커를 만듦
+        FastMarkerCluster(
+            places[["lat", "lon"]].assign(popup="<b>" + places["name"] + "</b><br>" + places["desc"]).values.tolist(),
+            callback="""
+            function (row) {
+                var marker = L.marker(new L.LatLng(row[0], row[1]));
+                marker.bindPopup(row[2]);
+                return marker;
+            };""",
+        ).add_to(m)
+    else:
+        cluster = MarkerCluster().add_to(m)
+        for place in places.itertuples():
+            folium.Marker(
+                location=[place.lat, place.lon],
+                popup=f"<b>{place.name}</b><br>{place.desc}",
+                icon=folium.Icon(color="pink", icon="heart", prefix="fa"),
+            ).add_to(cluster)
+    return m
+
+
+@instrumentation.cache(st.cache_data(persist="disk", max_entries=4))
+def map_html(path, mtime):
+    """파일이 바뀌었을 때(mtime)만 지도를 다시 만들어 완성된 HTML 로 보관"""
+    return build_map(path).get_root().render()
+
 
 # Streamlit에 지도 표시
-st_folium(m, width=900, height=600)
+if MAP_MODE == "interactive":
+    from streamlit_folium import st_folium
+
+    with instrumentation.span("map:build"):
+        m = build_map(PLACES_FILE)
+    with instrumentation.span("map:render"):
+        st_folium(m, width=900, height=MAP_HEIGHT, returned_objects=[])
+else:
+    with instrumentation.span("map:build"):
+        html = map_html(PLACES_FILE, os.path.getmtime(PLACES_FILE))
+    with instrumentation.span("map:render"):
+        if hasattr(st, "iframe"):
+            st.iframe(html, height=MAP_HEIGHT)
+        else:  # 예전 streamlit
+            import streamlit.components.v1 as components
+            components.html(html, height=MAP_HEIGHT)
+
+instrumentation.debug_panel()
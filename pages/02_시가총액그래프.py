@@ -1,59 +1,84 @@
 import streamlit as st
 import pandas as pd
-import yfinance as yf
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 
+import instrumentation
+import prewarm
+from market import currency
+from market.refresher import incomplete_symbols, refresh_symbols_batch, shared_refresher
+from market.service import ServiceClient, open_store
+from market.universe import as_dict, load_universe
+
 st.set_page_config(page_title="📈 글로벌 시가총액 Top 10", layout="wide")
+
+# 다른 페이지에서 쓰는 무거운 모듈은 백그라운드에서 미리 불러옴
+prewarm.start()
 st.title("📊 전 세계 시가총액 상위 10개 기업의 3년간 주가 변화")
 
-# 기업명과 티커 매핑
-companies = {
-    "Microsoft": "MSFT",
-    "Nvidia": "NVDA",
-    "Apple": "AAPL",
-    "Amazon": "AMZN",
-    "Alphabet": "GOOGL",
-    "Saudi Aramco": "2222.SR",  # 사우디 거래소
-    "Meta Platforms": "META",
-    "Tesla": "TSLA",
-    "Berkshire Hathaway": "BRK-B",
-    "Broadcom": "AVGO"
-}
+# 기업명과 티커 매핑 (data/universes/global_top10.csv)
+UNIVERSE_NAME = "global_top10"
 
 start_date = (datetime.today() - timedelta(days=365 * 3)).strftime('%Y-%m-%d')
-end_date = datetime.today().strftime('%Y-%m-%d')
-
-@st.cache_data
-def fetch_adj_close(ticker_dict, start, end):
-    all_data = {}
-    for name, ticker in ticker_dict.items():
-        try:
-            data = yf.download(ticker, start=start, end=end, interval="1mo", progress=False)
-            if 'Adj Close' in data.columns:
-                all_data[name] = data['Adj Close']
-        except Exception as e:
-            st.warning(f"{name} ({ticker}) 데이터 다운로드 실패: {e}")
-    df = pd.DataFrame(all_data)
-    return df.dropna(how="all")
-
-df = fetch_adj_close(companies, start_date, end_date)
+
+@st.cache_resource
+def get_store():
+    """프로세스 간에 공유되는 로컬 주가 저장소 (03 페이지와 같은 일봉 데이터를 사용)
+    MARKET_SERVICE_URL 이 설정되어 있으면 공용 주가 서비스의 클라이언트"""
+    return open_store()
+
+def ensure_symbols(universe_name):
+    """
+    저장소에 한 번도 없던 종목(과 환산용 환율)만 한 번의 yf.download 로 받고,
+    오래된 종목과 받지 못한 종목의 재시도는 프로세스 공용 백그라운드 갱신 스레드에 맡깁니다.
+    반환: 저장소 버전(마지막 수집 시각)
+    """
+    store = get_store()
+    universe = load_universe(universe_name)
+    ticker_to_name = {ticker: name for name, ticker in as_dict(universe).items()}
+    symbols = [*ticker_to_name, *currency.fx_symbols(universe["currency"])]
+    for ticker, error in refresh_symbols_batch(store, incomplete_symbols(store, symbols, fundamentals=False)):
+        if error is not None:
+            st.warning(f"{ticker_to_name.get(ticker, ticker)} ({ticker}) 데이터 다운로드 실패: {error}")
+    if not isinstance(store, ServiceClient):  # 서비스를 쓰면 서비스가 갱신을 맡음
+        shared_refresher(store, symbols, fundamentals=False)  # 이 페이지는 주가만 씀
+    return store.last_update(symbols)
+
+@instrumentation.cache(st.cache_data(ttl=300, max_entries=4))
+def fetch_adj_close(universe_name, start, store_version):
+    """저장소의 마지막 스냅샷에서 월별 종가를 읽음 (store_version 이 바뀌면 다시 읽음)"""
+    store = get_store()
+    universe = load_universe(universe_name)
+    ticker_to_name = {ticker: name for name, ticker in as_dict(universe).items()}
+    currencies = universe.set_index("symbol")["currency"]
+    fx_symbols = currency.fx_symbols(currencies)
+    with instrumentation.span("store:read"):
+        daily = store.read_closes(ticker_to_name, start=start)
+        fx = store.read_closes(fx_symbols, start=pd.Timestamp(start) - pd.Timedelta(days=14))
+    # 현지 통화 종가를 보고 통화로 환산한 뒤 일봉을 월 단위로 묶어 각 달의 마지막 수정 종가만 사용
+    monthly = currency.convert(daily, currencies, fx).resample("MS").last()
+    return monthly.rename(columns=ticker_to_name).dropna(how="all")
+
+df = fetch_adj_close(UNIVERSE_NAME, start_date, ensure_symbols(UNIVERSE_NAME))
 
 # 그래프 생성
-fig = go.Figure()
-for company in df.columns:
-    fig.add_trace(go.Scatter(
-        x=df.index,
-        y=df[company],
-        mode='lines+markers',
-        name=company
-    ))
-
-fig.update_layout(
-    title="💹 시가총액 상위 10개 기업의 주가 변화 (최근 3년)",
-    xaxis_title="날짜",
-    yaxis_title="주가 (USD)",
-    hovermode="x unified"
-)
-
-st.plotly_chart(fig, use_container_width=True)
+with instrumentation.span("figure:price_chart"):
+    fig = go.Figure()
+    for company in df.columns:
+        fig.add_trace(go.Scatter(
+            x=df.index,
+            y=df[company],
+            mode='lines+markers',
+            name=company
+        ))
+
+    fig.update_layout(
+        title="💹 시가총액 상위 10개 기업의 주가 변화 (최근 3년)",
+        xaxis_title="날짜",
+        yaxis_title=f"주가 ({currency.REPORTING_CURRENCY})",
+        hovermode="x unified"
+    )
+
+instrumentation.plotly_chart(fig, "price_chart", use_container_width=True)
+
+instrumentation.debug_panel()
@@ -1,10 +1,23 @@
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
+import os
 import pandas as pd
-import yfinance as yf
+import time
 from datetime import datetime, timedelta
-import numpy as np
+from functools import partial
+from itertools import chain
+
+import instrumentation
+import prewarm
+from market import currency, rolling
+from market.analytics import MARKET_CAP, PRICE, market_cap_matrix, shares_outstanding
+from market.block import PriceBlock
+from market.downsample import auto_points, downsample
+from market.refresher import fill_missing, incomplete_symbols, shared_refresher
+from market.service import ServiceClient, open_store
+from market.snapshot import FORMATS, load_dashboard, snapshot_name, snapshot_tables, to_bytes
+from market.universe import as_dict, load_universe, page_count, paginate, screen
 
 # 페이지 설정
 st.set_page_config(
@@ -13,6 +26,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# 다른 페이지에서 쓰는 무거운 모듈은 백그라운드에서 미리 불러옴
+prewarm.start()
+
 # 제목과 설명
 st.title("🌍 글로벌 시가총액 Top 10 기업 - 3년간 변화 분석")
 st.markdown("""
@@ -20,151 +36,228 @@ st.markdown("""
 데이터는 Yahoo Finance에서 실시간으로 가져옵니다.
 """)
 
-# Top 10 기업 정보 (2025년 5월 기준)
-TOP_10_COMPANIES = {
-    'Apple': 'AAPL',
-    'Nvidia': 'NVDA', 
-    'Microsoft': 'MSFT',
-    'Alphabet': 'GOOGL',
-    'Amazon': 'AMZN',
-    'Meta Platforms': 'META',
-    'Tesla': 'TSLA',
-    'Berkshire Hathaway': 'BRK-A',
-    'Taiwan Semiconductor': 'TSM',
-    'Broadcom': 'AVGO'
-}
+# 추적 대상 기업 목록 (data/universes/<이름>.csv, MARKET_UNIVERSE 환경 변수로 변경)
+UNIVERSE_NAME = os.environ.get("MARKET_UNIVERSE", "top10")
+UNIVERSE = load_universe(UNIVERSE_NAME)
 
-@st.cache_data(ttl=3600)  # 1시간 캐시
-def get_stock_data(symbol, period="3y"):
-    """주식 데이터를 가져오는 함수"""
-    try:
-        stock = yf.Ticker(symbol)
-        hist = stock.get_history(period=period)
-        info = stock.get_info()
-        
-        # 시가총액 계산 (주가 * 발행주식수)
-        shares_outstanding = info.get('sharesOutstanding', info.get('impliedSharesOutstanding', 1))
-        hist['Market_Cap'] = hist['Close'] * shares_outstanding / 1e12  # 조 달러 단위
-        
-        return hist, info
-    except Exception as e:
-        st.error(f"{symbol} 데이터를 가져오는 중 오류 발생: {e}")
-        return None, None
-
-@st.cache_data(ttl=3600)
-def load_all_data():
-    """모든 기업의 데이터를 로드"""
-    all_data = {}
-    company_info = {}
+MAX_TRACES = 20  # 메인 차트에 한 번에 그릴 최대 기업 수
+PAGE_SIZE = 25  # 순위 표 한 페이지의 행 수
+MAX_MARKERS = 150  # trace 하나의 점이 이보다 많으면 마커 없이 선만 그림
+STREAM_REDRAW_INTERVAL = 1.0  # 처음 불러오는 동안 차트/표를 다시 보내는 최소 간격(초)
+
+@st.cache_resource
+def get_store():
+    """프로세스 간에 공유되는 로컬 주가 저장소 (MARKET_SERVICE_URL 이 설정되어 있으면 공용 주가 서비스의 클라이언트)"""
+    return open_store()
+
+def track_symbols(universe):
+    """이 페이지의 종목(과 환율)을 프로세스 공용 백그라운드 갱신 스레드에 등록 (TTL 이 끝나기 전에 미리 갱신)"""
+    if isinstance(get_store(), ServiceClient):
+        return None  # 주가 서비스가 갱신을 맡음
+    symbols = [*universe['symbol'], *currency.fx_symbols(universe['currency'])]
+    return shared_refresher(get_store(), symbols)
+
+# 저장소가 갱신되면 이전 버전은 곧 쓰이지 않으므로 최근 두 버전만 보관
+@instrumentation.cache(st.cache_resource(ttl=3600, max_entries=2))
+def load_all_data(universe_name, store_version):
+    """
+    모든 기업의 데이터를 저장소에서 로드합니다.
+    store_version(저장소의 마지막 수집 시각)이 바뀌면 새로 읽고, 갱신 자체는 백그라운드 스레드가 맡습니다.
+    여기서는 저장소를 읽기만 합니다. 처음 보는 종목은 stream_missing 이 먼저 받아 둡니다
+    (이 함수 안에서 띄운 메시지는 캐시와 함께 모든 세션에 다시 나타나므로 오류도 그쪽에서 표시).
+
+    반환: (차트용 종가/시가총액/롤링 지표 PriceBlock, 기업별 지표 DataFrame)
+    cache_resource 라 모든 세션이 복사 없이 같은 객체를 보므로 호출하는 쪽에서 값을 바꾸면 안 됩니다.
+    """
+    store = get_store()
+    universe = load_universe(universe_name)
+    # 지표는 float64 원본으로 계산하고, 차트용 시계열만 float32 블록으로 줄여서 보관
+    frames, metrics = load_dashboard(store, universe)
+    block = PriceBlock.from_frames(**frames)
+    return block, metrics
+
+def stream_missing(universe):
+    """
+    저장소에 없는 종목이 있을 때(처음 실행 등) 자리만 먼저 만들어 두고,
+    종목을 받는 대로 차트와 순위 표에 추가해 보여 줍니다.
+    첫 차트는 가장 빨리 끝난 종목을 기다리는 만큼만 걸리고, 다 받으면 자리를 비워 아래 본문이 그립니다.
+    종목이 많아도 보내는 양이 늘지 않도록 차트는 지금까지의 시가총액 상위 MAX_TRACES 개,
+    표는 상위 PAGE_SIZE 행만 그리고, 다시 그리는 것은 STREAM_REDRAW_INTERVAL 초에 한 번으로 제한합니다.
+    """
+    store = get_store()
+    symbol_to_company = {symbol: company for company, symbol in as_dict(universe).items()}
+    currencies = universe.set_index('symbol')['currency']
+    fx_symbols = currency.fx_symbols(currencies)
+    missing = incomplete_symbols(store, symbol_to_company)
+    missing_fx = incomplete_symbols(store, fx_symbols)
+    if not missing and not missing_fx:
+        return
+    # 이미 저장된 종목은 곧바로, 나머지는 끝나는 순서대로
+    ready = [(symbol, None) for symbol in symbol_to_company if symbol not in missing]
+    start = datetime.now() - timedelta(days=365 * 3)
     
-    progress_bar = st.progress(0)
-    progress_text = st.empty()
+    progress = st.progress(0.0, text="처음 불러오는 종목이 있어 받는 대로 먼저 보여 드립니다...")
+    # 현지 통화 종목을 환산할 환율을 먼저 받아 둠
+    errors = [f"{symbol} 환율을 가져오는 중 오류 발생: {error}"
+              for symbol, error in fill_missing(store, missing_fx) if error is not None]
+    fx = store.read_closes(fx_symbols, start=start - timedelta(days=14))
+    chart_slot = st.empty()
+    table_slot = st.empty()
+    series = {}  # 상위 MAX_TRACES 개 기업의 차트용 시계열만 보관
+    rows = []
+    draws = 0
+    last_draw = None
     
-    total_companies = len(TOP_10_COMPANIES)
+    def redraw():
+        fig = go.Figure(layout=dict(
+            title="시가총액 변화 (불러오는 중)", yaxis_title=f"시가총액 (조 {currency.REPORTING_NAME})",
+            height=600, template="plotly_white", hovermode='x unified',
+        ))
+        for company, market_cap in series.items():
+            fig.add_trace(go.Scatter(x=market_cap.index, y=market_cap.values, mode='lines', name=company))
+        with chart_slot:
+            instrumentation.plotly_chart(fig, "stream_chart", use_container_width=True, key=f"stream_chart_{draws}")
+        table_slot.dataframe(
+            pd.DataFrame(rows).head(PAGE_SIZE)
+            .style.format({MARKET_CAP: '{:.2f}', PRICE: '{:.2f}'}),
+            hide_index=True, use_container_width=True,
+        )
     
-    for i, (company, symbol) in enumerate(TOP_10_COMPANIES.items()):
-        progress_text.text(f"데이터 로딩 중: {company} ({symbol})")
-        progress_bar.progress((i + 1) / total_companies)
+    for done, (symbol, error) in enumerate(chain(ready, fill_missing(store, missing)), 1):
+        progress.progress(done / len(symbol_to_company), text=f"{symbol_to_company[symbol]} ({symbol}) 완료 - {done}/{len(symbol_to_company)}")
+        if error is not None:
+            errors.append(f"{symbol} 데이터를 가져오는 중 오류 발생: {error}")
+            continue
         
-        hist, info = get_stock_data(symbol)
-        if hist is not None:
-            all_data[company] = hist
-            company_info[company] = info
-    
-    progress_bar.empty()
-    progress_text.empty()
+        close = currency.convert(store.read_closes([symbol], start=start), currencies, fx).get(symbol)
+        fundamentals = store.read_fundamentals([symbol]).get(symbol)
+        if close is None or fundamentals is None:
+            continue
+        market_cap = market_cap_matrix(
+            close.to_frame(), store.read_shares_history([symbol]),
+            pd.Series({symbol: shares_outstanding(fundamentals)}, dtype=float),
+        )[symbol].dropna()
+        if market_cap.empty:
+            continue
+        
+        company = symbol_to_company[symbol]
+        rows.append({'Company': company, 'Symbol': symbol,
+                     MARKET_CAP: market_cap.iloc[-1], PRICE: close.dropna().iloc[-1]})
+        rows.sort(key=lambda row: row[MARKET_CAP], reverse=True)
+        top = [row['Company'] for row in rows[:MAX_TRACES]]
+        if company in top:
+            series[company] = downsample(market_cap, auto_points())
+            series = {name: series[name] for name in top if name in series}
+        
+        # 첫 종목은 곧바로, 이후에는 STREAM_REDRAW_INTERVAL 초마다 한 번씩만 다시 보냄
+        now = time.monotonic()
+        if last_draw is None or now - last_draw >= STREAM_REDRAW_INTERVAL:
+            draws += 1
+            redraw()
+            last_draw = now
     
-    return all_data, company_info
+    for slot in (progress, chart_slot, table_slot):
+        slot.empty()
+    for message in errors:
+        st.error(message)
 
-# 데이터 로딩
+# 데이터 로딩 (저장소의 마지막 스냅샷을 바로 사용하고, 갱신은 백그라운드에서)
+# 빈 저장소에서는 받는 대로 먼저 그려 보여 줌
+stream_missing(UNIVERSE)
+# 환율이 나중에 채워져도 다시 읽도록 환율 티커도 버전에 포함
+store_version = get_store().last_update([*UNIVERSE['symbol'], *currency.fx_symbols(UNIVERSE['currency'])])
 with st.spinner("데이터를 불러오는 중..."):
-    stock_data, company_info = load_all_data()
+    price_block, metrics = load_all_data(UNIVERSE_NAME, store_version)
+    data_version = price_block.version
+# 처음 채우는 동안 같은 종목을 중복으로 받지 않도록 로딩이 끝난 뒤 백그라운드 갱신을 시작
+track_symbols(UNIVERSE)
 
-if not stock_data:
+if not len(price_block):
     st.error("데이터를 불러올 수 없습니다. 나중에 다시 시도해주세요.")
     st.stop()
 
-# 사이드바 설정
-st.sidebar.header("📊 차트 설정")
+as_of = get_store().as_of(UNIVERSE['symbol'])
+if as_of is not None:
+    st.caption(f"🕒 데이터 기준 시각: {datetime.fromtimestamp(as_of):%Y-%m-%d %H:%M} (백그라운드에서 자동 갱신)")
 
-# 기업 선택 (멀티셀렉트)
-selected_companies = st.sidebar.multiselect(
-    "표시할 기업 선택:",
-    options=list(TOP_10_COMPANIES.keys()),
-    default=list(TOP_10_COMPANIES.keys())[:5]  # 기본적으로 상위 5개 선택
+# 스크리너 (필터링과 상위 N 선택은 서버에서 처리)
+st.sidebar.header("🔎 스크리너")
+selected_sectors = st.sidebar.multiselect("섹터:", options=sorted(UNIVERSE['sector'].dropna().unique()))
+selected_exchanges = st.sidebar.multiselect("거래소:", options=sorted(UNIVERSE['exchange'].dropna().unique()))
+top_n = st.sidebar.number_input(
+    "시가총액 상위 N개:",
+    min_value=1,
+    max_value=max(1, len(metrics)),
+    value=min(100, max(1, len(metrics)))
 )
+screened = screen(metrics, UNIVERSE, sectors=selected_sectors, exchanges=selected_exchanges, top_n=top_n)
 
-# 기간 선택
+# 기간 선택지
+PERIOD_DAYS = {"최근 1년": 365, "최근 2년": 730, "최근 3년": None}
 period_options = {
     "최근 1년": "1y",
     "최근 2년": "2y", 
     "최근 3년": "3y"
 }
-selected_period = st.sidebar.selectbox(
-    "기간 선택:",
-    options=list(period_options.keys()),
-    index=2  # 기본값: 3년
-)
-
-# 차트 타입 선택
-chart_type = st.sidebar.radio(
-    "차트 타입:",
-    ["라인 차트", "영역 차트", "로그 스케일"]
-)
 
-# 메인 차트
-st.subheader("📈 시가총액 변화 추이")
+def period_start(period):
+    """
+    기간의 시작일 (None 이면 처음부터). 날짜 단위로 잘라 하루 동안 같은 값이므로
+    차트 캐시의 키로 넘겨, 날짜가 바뀌면 데이터 버전이 그대로여도 차트를 다시 만듦
+    """
+    days = PERIOD_DAYS[period]
+    return None if days is None else pd.Timestamp.today().normalize() - pd.Timedelta(days=days)
 
-if selected_companies:
-    # 선택된 기업들의 데이터 준비
+# 최근에 쓴 64개 조합만 보관 (오래된 것부터 제거)
+@instrumentation.cache(st.cache_resource(max_entries=64))
+def build_main_figure(_block, data_version, companies, period, start_date, chart_type, resolution):
+    """(기업 목록, 기간과 시작일, 차트 타입, 해상도, 데이터 버전) 조합별로 메인 차트를 한 번만 생성"""
     fig = go.Figure()
     
     colors = px.colors.qualitative.Set3
+    start = 0 if start_date is None else _block.start_position(start_date)
     
-    for i, company in enumerate(selected_companies):
-        if company in stock_data:
-            data = stock_data[company]
-            
-            # 선택된 기간에 따라 데이터 필터링
-            if selected_period != "최근 3년":
-                end_date = datetime.now()
-                if selected_period == "최근 1년":
-                    start_date = end_date - timedelta(days=365)
-                else:  # 2년
-                    start_date = end_date - timedelta(days=730)
-                data = data[data.index >= start_date]
-            
-            color = colors[i % len(colors)]
-            
-            if chart_type == "영역 차트":
-                fig.add_trace(go.Scatter(
-                    x=data.index,
-                    y=data['Market_Cap'],
-                    mode='lines',
-                    name=company,
-                    line=dict(color=color),
-                    fill='tonexty' if i > 0 else 'tozeroy',
-                    fillcolor=color.replace('rgb', 'rgba').replace(')', ', 0.3)')
-                ))
-            else:
-                fig.add_trace(go.Scatter(
-                    x=data.index,
-                    y=data['Market_Cap'],
-                    mode='lines+markers',
-                    name=company,
-                    line=dict(color=color, width=3),
-                    marker=dict(size=6),
-                    hovertemplate='<b>%{fullData.name}</b><br>' +
-                                  '날짜: %{x}<br>' +
-                                  '시가총액: $%{y:.2f}T<br>' +
-                                  '<extra></extra>'
-                ))
+    for i, company in enumerate(companies):
+        if company not in _block:
+            continue
+        market_cap = _block.series(company, 'Market_Cap', start)
+        if resolution == "자동":
+            market_cap = downsample(market_cap, auto_points())
+        
+        color = colors[i % len(colors)]
+        
+        if chart_type == "영역 차트":
+            fig.add_trace(go.Scatter(
+                x=market_cap.index,
+                y=market_cap.values,
+                mode='lines',
+                name=company,
+                line=dict(color=color),
+                connectgaps=True,
+                fill='tonexty' if i > 0 else 'tozeroy',
+                fillcolor=color.replace('rgb', 'rgba').replace(')', ', 0.3)')
+            ))
+        else:
+            fig.add_trace(go.Scatter(
+                x=market_cap.index,
+                y=market_cap.values,
+                # 점이 촘촘하면 마커는 구분되지 않고 용량만 늘어나므로 선만 그림
+                mode='lines+markers' if market_cap.count() <= MAX_MARKERS else 'lines',
+                name=company,
+                connectgaps=True,
+                line=dict(color=color, width=3),
+                marker=dict(size=6),
+                hovertemplate='<b>%{fullData.name}</b><br>' +
+                              '날짜: %{x}<br>' +
+                              f'시가총액: %{{y:.2f}}조 {currency.REPORTING_NAME}<br>' +
+                              '<extra></extra>'
+            ))
     
     # 차트 레이아웃 설정
     fig.update_layout(
-        title=f"시가총액 변화 ({period_options[selected_period]})",
+        title=f"시가총액 변화 ({period_options[period]})",
         xaxis_title="날짜",
-        yaxis_title="시가총액 (조 달러)",
+        yaxis_title=f"시가총액 (조 {currency.REPORTING_NAME})",
         hovermode='x unified',
         legend=dict(
             orientation="h",
@@ -179,128 +272,267 @@ if selected_companies:
     
     # 로그 스케일 적용
     if chart_type == "로그 스케일":
-        fig.update_yaxis(type="log")
+        fig.update_yaxes(type="log")
     
-    st.plotly_chart(fig, use_container_width=True)
-else:
-    st.warning("하나 이상의 기업을 선택해주세요.")
-
-# 현재 시가총액 순위
-st.subheader("🏆 현재 시가총액 순위")
-
-# 현재 시가총액 데이터 생성
-current_market_caps = []
-for company, symbol in TOP_10_COMPANIES.items():
-    if company in stock_data and company in company_info:
-        try:
-            latest_price = stock_data[company]['Close'].iloc[-1]
-            shares = company_info[company].get('sharesOutstanding', 
-                    company_info[company].get('impliedSharesOutstanding', 1))
-            market_cap = (latest_price * shares) / 1e12
-            current_market_caps.append({
-                'Company': company,
-                'Symbol': symbol,
-                'Market Cap (T$)': market_cap,
-                'Latest Price ($)': latest_price
-            })
-        except:
+    return fig
+
+# 롤링 지표 선택지 -> (블록 필드, y축 제목)
+ROLLING_VIEWS = {
+    "이동 변동성 30일": ('Vol_30', "연율화 변동성 (%)"),
+    "이동 변동성 90일": ('Vol_90', "연율화 변동성 (%)"),
+    "이동 변동성 252일": ('Vol_252', "연율화 변동성 (%)"),
+    "낙폭": ('Drawdown', "고점 대비 (%)"),
+}
+
+@instrumentation.cache(st.cache_resource(max_entries=64))
+def build_rolling_figure(_block, data_version, companies, view, period, start_date):
+    """선택한 기업들의 롤링 지표 한 가지를 기간에 맞춰 그림"""
+    field, y_title = ROLLING_VIEWS[view]
+    start = 0 if start_date is None else _block.start_position(start_date)
+    fig = go.Figure()
+    for company in companies:
+        if company not in _block:
             continue
+        series = downsample(_block.series(company, field, start), auto_points())
+        fig.add_trace(go.Scatter(x=series.index, y=series.values, mode='lines', name=company))
+    fig.update_layout(
+        title=f"{view} ({period_options[period]})", yaxis_title=y_title,
+        hovermode='x unified', height=450, template="plotly_white",
+    )
+    return fig
+
+@instrumentation.cache(st.cache_resource(max_entries=64))
+def build_ma_figure(_block, data_version, company, period, start_date):
+    """한 기업의 종가와 50/200일 이동평균"""
+    start = 0 if start_date is None else _block.start_position(start_date)
+    fig = go.Figure()
+    for field, name in [('Close', "종가"), ('MA_50', "50일 이동평균"), ('MA_200', "200일 이동평균")]:
+        series = downsample(_block.series(company, field, start), auto_points())
+        fig.add_trace(go.Scatter(x=series.index, y=series.values, mode='lines', name=name))
+    fig.update_layout(
+        title=f"{company} 이동평균 ({period_options[period]})", yaxis_title="가격",
+        hovermode='x unified', height=450, template="plotly_white",
+    )
+    return fig
+
+@instrumentation.cache(st.cache_resource(max_entries=64))
+def build_correlation_figure(_block, data_version, companies):
+    """선택한 기업들의 최근 1년 일간 수익률 상관계수 히트맵 (데이터 버전과 기업 조합별로 한 번만 계산)"""
+    correlation = rolling.correlation(_block.frame('Close')[list(companies)])
+    fig = px.imshow(
+        correlation, text_auto='.2f', zmin=-1, zmax=1,
+        color_continuous_scale='RdBu_r', aspect='auto',
+    )
+    fig.update_layout(height=max(400, 40 * len(correlation)))
+    return fig
+
+# 데이터 내보내기 (python -m market.snapshot 과 같은 파일)
+@instrumentation.cache(st.cache_data(max_entries=8))
+def snapshot_bytes(_block, _metrics, data_version, universe_name, as_of, table, fmt):
+    """데이터 버전과 형식별로 스냅샷 파일 내용을 한 번만 생성 (버튼을 누를 때 호출)"""
+    tables = snapshot_tables(_block.frame('Close'), _block.frame('Market_Cap'), _metrics)
+    metadata = {"universe": universe_name, "as_of": datetime.fromtimestamp(as_of or 0).isoformat(), "table": table}
+    return to_bytes(tables[table], fmt, metadata)
+
+# 아래 섹션들은 st.fragment 로 나눠, 섹션 안의 위젯을 바꾸면 그 섹션만 다시 실행하고 다시 보냄
+# (데이터 로딩, 스크리너, 다른 섹션의 차트는 다시 실행하지 않음)
+
+@st.fragment
+def main_chart_section(companies, period):
+    """메인 차트 (차트 타입/해상도를 바꾸면 이 차트만 다시 그림)"""
+    col_type, col_resolution = st.columns([2, 1])
+    with col_type:
+        # 차트 타입 선택
+        chart_type = st.radio(
+            "차트 타입:",
+            ["라인 차트", "영역 차트", "로그 스케일"],
+            horizontal=True
+        )
+    with col_resolution:
+        # 차트 해상도 (자동: 화면 픽셀에 맞게 점 개수를 줄여서 전송)
+        resolution = st.radio(
+            "차트 해상도:",
+            ["자동", "원본"],
+            horizontal=True
+        )
+    
+    fig = build_main_figure(
+        price_block,
+        data_version,
+        tuple(companies),
+        period,
+        period_start(period),
+        chart_type,
+        resolution
+    )
+    instrumentation.plotly_chart(fig, "main_chart", use_container_width=True)
+
+@st.fragment
+def rolling_section(companies, period):
+    """롤링 지표 차트 (지표/기업을 바꾸면 이 차트만 다시 그림)"""
+    rolling_view = st.radio("지표:", [*ROLLING_VIEWS, "이동평균"], horizontal=True)
+    if rolling_view == "이동평균":
+        ma_company = st.selectbox("기업:", companies)
+        fig_rolling = build_ma_figure(price_block, data_version, ma_company, period, period_start(period))
+    else:
+        fig_rolling = build_rolling_figure(
+            price_block, data_version, tuple(companies), rolling_view, period, period_start(period)
+        )
+    instrumentation.plotly_chart(fig_rolling, "rolling_chart", use_container_width=True)
+
+@st.fragment
+def analysis_section(screened):
+    """선택한 기업들의 차트 (기업/기간을 바꾸면 순위표와 수익률 표는 그대로 두고 이 섹션만 다시 그림)"""
+    st.subheader("📈 시가총액 변화 추이")
+    
+    col_companies, col_period = st.columns([3, 1])
+    with col_companies:
+        # 기업 선택 (멀티셀렉트) - 한 번에 그리는 기업 수는 MAX_TRACES 개로 제한
+        selected_companies = st.multiselect(
+            "표시할 기업 선택:",
+            options=list(screened.index),
+            default=list(screened.index)[:5],  # 기본적으로 상위 5개 선택
+            max_selections=MAX_TRACES
+        )
+    with col_period:
+        # 기간 선택
+        selected_period = st.selectbox(
+            "기간 선택:",
+            options=list(period_options.keys()),
+            index=2  # 기본값: 3년
+        )
+    
+    if not selected_companies:
+        st.warning("하나 이상의 기업을 선택해주세요.")
+        return
+    main_chart_section(selected_companies, selected_period)
+    
+    # 변동성 분석
+    st.subheader("📈 변동성 분석")
+    
+    df_volatility = (
+        metrics.loc[metrics.index.intersection(selected_companies, sort=False), ['Annual Volatility (%)']]
+        .dropna().sort_values('Annual Volatility (%)').reset_index()
+    )
+    
+    if not df_volatility.empty:
+        fig_vol = px.bar(
+            df_volatility,
+            x='Company',
+            y='Annual Volatility (%)',
+            title="연간 변동성 비교",
+            color='Annual Volatility (%)',
+            color_continuous_scale='reds'
+        )
+        fig_vol.update_layout(height=400)
+        instrumentation.plotly_chart(fig_vol, "volatility_chart", use_container_width=True)
+    
+    # 롤링 지표 (저장소에서 증분으로 계산해 둔 값)
+    if 'Drawdown' in price_block.fields:
+        st.subheader("📉 롤링 지표")
+        rolling_section(selected_companies, selected_period)
+        
+        df_risk = (
+            metrics.loc[metrics.index.intersection(selected_companies, sort=False), ['Volatility 90D (%)', 'Max Drawdown (%)']]
+            .sort_values('Max Drawdown (%)').reset_index()
+        )
+        st.dataframe(
+            df_risk.style.format({'Volatility 90D (%)': '{:.1f}%', 'Max Drawdown (%)': '{:.1f}%'}),
+            hide_index=True
+        )
+    
+    # 상관관계 (최근 1년 일간 수익률)
+    if len(selected_companies) > 1:
+        st.subheader("🔗 수익률 상관관계 (최근 1년)")
+        fig_corr = build_correlation_figure(price_block, data_version, tuple(selected_companies))
+        instrumentation.plotly_chart(fig_corr, "correlation_chart", use_container_width=True)
 
-if current_market_caps:
-    df_current = pd.DataFrame(current_market_caps)
-    df_current = df_current.sort_values('Market Cap (T$)', ascending=False).reset_index(drop=True)
+@st.fragment
+def ranking_section(screened):
+    """현재 시가총액 순위 (페이지를 넘기면 순위 차트와 표만 다시 그림)"""
+    st.subheader("🏆 현재 시가총액 순위")
+    
+    if screened.empty:
+        return
+    df_current = screened.reset_index()[['Company', 'Symbol', MARKET_CAP, PRICE]]
     df_current.index += 1
     
+    # 한 페이지 분량만 차트와 표로 보냄
+    n_pages = page_count(len(df_current), PAGE_SIZE)
+    page = st.number_input("페이지", min_value=1, max_value=n_pages, value=1) if n_pages > 1 else 1
+    df_page = paginate(df_current, page, PAGE_SIZE)
+    
     # 순위 차트
     fig_ranking = px.bar(
-        df_current.head(10), 
-        x='Market Cap (T$)', 
+        df_page, 
+        x=MARKET_CAP, 
         y='Company',
         orientation='h',
-        title="현재 시가총액 Top 10",
-        color='Market Cap (T$)',
+        title=f"현재 시가총액 {df_page.index[0]}~{df_page.index[-1]}위 (전체 {len(df_current)}개)",
+        color=MARKET_CAP,
         color_continuous_scale='viridis'
     )
-    fig_ranking.update_layout(height=500, yaxis={'categoryorder':'total ascending'})
-    st.plotly_chart(fig_ranking, use_container_width=True)
+    fig_ranking.update_layout(height=max(500, 20 * len(df_page)), yaxis={'categoryorder':'total ascending'})
+    instrumentation.plotly_chart(fig_ranking, "ranking_chart", use_container_width=True)
     
     # 테이블로도 표시
     st.dataframe(
-        df_current.head(10).style.format({
-            'Market Cap (T$)': '{:.2f}',
-            'Latest Price ($)': '{:.2f}'
+        df_page.style.format({
+            MARKET_CAP: '{:.2f}',
+            PRICE: '{:.2f}'
         }),
         use_container_width=True
     )
 
-# 성장률 분석
-st.subheader("📊 성장률 분석")
-
-col1, col2 = st.columns(2)
-
-with col1:
-    st.write("**1년 수익률 Top 5**")
-    returns_1y = []
-    for company in TOP_10_COMPANIES.keys():
-        if company in stock_data:
-            data = stock_data[company]
-            if len(data) >= 252:  # 1년 데이터
-                return_1y = ((data['Close'].iloc[-1] / data['Close'].iloc[-252]) - 1) * 100
-                returns_1y.append({'Company': company, 'Return (%)': return_1y})
+def growth_section(screened):
+    """성장률 분석 (스크리너 결과에만 의존하므로 차트 위젯을 바꿔도 다시 실행되지 않음)"""
+    st.subheader("📊 성장률 분석")
     
-    if returns_1y:
-        df_returns_1y = pd.DataFrame(returns_1y).sort_values('Return (%)', ascending=False)
-        st.dataframe(
-            df_returns_1y.head(5).style.format({'Return (%)': '{:.1f}%'}),
-            hide_index=True
-        )
-
-with col2:
-    st.write("**3년 수익률 Top 5**")
-    returns_3y = []
-    for company in TOP_10_COMPANIES.keys():
-        if company in stock_data:
-            data = stock_data[company]
-            if len(data) >= 756:  # 3년 데이터
-                return_3y = ((data['Close'].iloc[-1] / data['Close'].iloc[0]) - 1) * 100
-                returns_3y.append({'Company': company, 'Return (%)': return_3y})
+    col1, col2 = st.columns(2)
     
-    if returns_3y:
-        df_returns_3y = pd.DataFrame(returns_3y).sort_values('Return (%)', ascending=False)
-        st.dataframe(
-            df_returns_3y.head(5).style.format({'Return (%)': '{:.1f}%'}),
-            hide_index=True
-        )
+    for col, label, column in [(col1, "1년", 'Return 1Y (%)'), (col2, "3년", 'Return 3Y (%)')]:
+        with col:
+            st.write(f"**{label} 수익률 Top 5**")
+            df_returns = (
+                screened[column].dropna().nlargest(5)
+                .rename('Return (%)').reset_index()
+            )
+            if not df_returns.empty:
+                st.dataframe(
+                    df_returns.style.format({'Return (%)': '{:.1f}%'}),
+                    hide_index=True
+                )
 
-# 변동성 분석
-st.subheader("📈 변동성 분석")
+@st.fragment
+def export_section():
+    """데이터 내보내기 (형식을 바꾸면 이 섹션만 다시 그림)"""
+    with st.expander("💾 데이터 내보내기"):
+        st.caption("종가/시가총액 시계열과 기업별 지표를 데이터 기준 시각으로 이름 붙인 파일로 받습니다. "
+                   "정기적으로 받으려면 `python -m market.snapshot` 을 사용하세요.")
+        export_format = st.radio("형식:", list(FORMATS), horizontal=True, format_func=str.capitalize)
+        export_cols = st.columns(2)
+        for col, table, label in [(export_cols[0], 'prices', "종가/시가총액"), (export_cols[1], 'metrics', "기업별 지표")]:
+            with col:
+                st.download_button(
+                    label,
+                    # 버튼을 누를 때만 파일을 만듦
+                    data=partial(snapshot_bytes, price_block, metrics, data_version, UNIVERSE_NAME, as_of, table, export_format),
+                    file_name=snapshot_name(UNIVERSE_NAME, as_of, table, export_format),
+                    mime=FORMATS[export_format][1],
+                    on_click="ignore",
+                )
 
-volatility_data = []
-for company in selected_companies:
-    if company in stock_data:
-        data = stock_data[company]
-        daily_returns = data['Close'].pct_change().dropna()
-        volatility = daily_returns.std() * np.sqrt(252) * 100  # 연간 변동성
-        volatility_data.append({'Company': company, 'Annual Volatility (%)': volatility})
-
-if volatility_data:
-    df_volatility = pd.DataFrame(volatility_data).sort_values('Annual Volatility (%)')
-    
-    fig_vol = px.bar(
-        df_volatility,
-        x='Company',
-        y='Annual Volatility (%)',
-        title="연간 변동성 비교",
-        color='Annual Volatility (%)',
-        color_continuous_scale='reds'
-    )
-    fig_vol.update_layout(height=400)
-    st.plotly_chart(fig_vol, use_container_width=True)
+analysis_section(screened)
+ranking_section(screened)
+growth_section(screened)
+export_section()
 
 # 푸터
 st.markdown("---")
 st.markdown("""
 **데이터 출처:** Yahoo Finance  
-**업데이트:** 실시간 (1시간 캐시)  
+**업데이트:** 백그라운드에서 1시간 이내로 자동 갱신  
 **면책조항:** 이 데이터는 투자 조언이 아닙니다. 투자 결정은 전문가와 상담 후 신중히 하시기 바랍니다.
 """)
+
+instrumentation.debug_panel()
@@ -0,0 +1,66 @@
+"""
+서버가 뜬 뒤 무거운 모듈을 백그라운드에서 미리 import
+
+각 페이지는 자기가 쓰는 모듈만 import 하므로 MBTI 페이지처럼 가벼운 페이지는 바로 뜨고,
+차트/지도 페이지에서 쓰는 pandas, plotly, yfinance, folium 등은 첫 요청이 처리된 뒤
+별도 스레드에서 미리 불러와 두어 다른 페이지의 첫 방문도 빨라지게 합니다.
+"""
+import importlib
+import logging
+import os
+import threading
+import time
+
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# 미리 불러올 모듈 (앞쪽일수록 먼저, 여러 페이지가 함께 쓰는 것부터)
+MODULES = (
+    "numpy",
+    "pandas",
+    "plotly.graph_objects",
+    "plotly.express",
+    "market.store",
+    "market.analytics",
+    "market.downsample",
+    "market.refresher",
+    "market.universe",
+    "yfinance",
+    "folium",
+    "folium.plugins",
+)
+START_DELAY = 1.0  # 첫 페이지가 그려지는 동안은 CPU 를 양보
+ENABLED = os.environ.get("APP_PREWARM", "1") != "0"  # APP_PREWARM=0 이면 끔 (측정용)
+
+_lock = threading.Lock()
+_thread = None
+_done = threading.Event()
+
+
+def _run(modules, delay):
+    time.sleep(delay)
+    for name in modules:
+        try:
+            with instrumentation.span(f"prewarm:{name}"):
+                importlib.import_module(name)
+        except Exception as e:
+            logger.warning("%s 미리 불러오기 실패: %s", name, e)
+    _done.set()
+
+
+def start(modules=MODULES, delay=START_DELAY):
+    """프로세스마다 한 번만 백그라운드 import 를 시작 (여러 번 불러도 안전)"""
+    global _thread
+    if not ENABLED:
+        return None
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, args=(modules, delay), name="prewarm", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def wait(timeout=None):
+    """미리 불러오기가 끝날 때까지 대기 (벤치마크용)"""
+    return _done.wait(timeout)
@@ -0,0 +1,119 @@
+"""
+MBTI 추천 엔진 (여행지, 선물 페이지가 함께 사용)
+
+추천 목록은 data/catalogs/<이름>.json 카탈로그 파일로 관리합니다.
+
+    {"items": [
+        {"name": "📚 교토, 일본", "desc": "...", "theme": "...",
+         "traits": {"I": 2, "N": 1},   # 성향 글자별 가중치 (반대 글자에는 같은 크기로 감점)
+         "types": ["INTJ"],            # 이 유형이면 가장 먼저 추천 (선택)
+         "base": 0.5}                  # 성향과 무관한 기본 점수 (선택)
+    ]}
+
+파일을 읽을 때 16개 전체 유형과 'IN', 'E?T?' 같은 일부 성향 조합(? 는 상관없음)마다
+점수 상위 MAX_K 개를 미리 계산해 두므로, 요청마다의 추천은 딕셔너리 조회 한 번입니다.
+파일 수정 시각이 바뀌면 다음 조회 때 다시 읽으므로 앱을 재시작하지 않아도 됩니다.
+"""
+import heapq
+import itertools
+import json
+import os
+import threading
+
+CATALOG_DIR = os.environ.get(
+    "CATALOG_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "catalogs"),
+)
+MAX_K = 20  # 미리 계산해 두는 추천 개수
+TYPE_BONUS = 100.0  # 유형이 정확히 지정된 항목은 성향 점수와 상관없이 먼저 추천
+
+# 성향 축별 (+1 글자, -1 글자)
+DIMENSIONS = (("E", "I"), ("S", "N"), ("T", "F"), ("J", "P"))
+# 화면에 보여 주는 순서
+MBTI_TYPES = [
+    "INTJ", "INTP", "ENTJ", "ENTP",
+    "INFJ", "INFP", "ENFJ", "ENFP",
+    "ISTJ", "ISFJ", "ESTJ", "ESFJ",
+    "ISTP", "ISFP", "ESTP", "ESFP",
+]
+
+
+def _signs(key):
+    """'INTJ' / 'I?T?' / 'IN' -> 축별 부호 (지정하지 않은 축은 0)"""
+    key = key.upper().ljust(4, "?")
+    return tuple(
+        1 if letter == plus else -1 if letter == minus else 0
+        for letter, (plus, minus) in zip(key, DIMENSIONS)
+    )
+
+
+def _weights(traits):
+    """{'I': 2, 'N': 1} -> 축별 가중치 (+1 글자 쪽이 양수)"""
+    weights = [0.0] * len(DIMENSIONS)
+    for letter, weight in traits.items():
+        for i, (plus, minus) in enumerate(DIMENSIONS):
+            if letter.upper() == plus:
+                weights[i] += weight
+            elif letter.upper() == minus:
+                weights[i] -= weight
+    return weights
+
+
+class Catalog:
+    """카탈로그 항목과 미리 계산한 성향 조합별 추천 순위"""
+
+    def __init__(self, items, max_k=MAX_K):
+        self.items = items
+        # 축별 가중치 열, 기본 점수, 유형 지정 항목
+        columns = list(zip(*[_weights(item.get("traits", {})) for item in items])) or [()] * len(DIMENSIONS)
+        bases = [float(item.get("base", 0.0)) for item in items]
+        typed = [(i, mbti_type) for i, item in enumerate(items) for mbti_type in item.get("types", ())]
+
+        # 16개 유형 + 일부 축만 지정한 조합 (각 축이 +, -, 상관없음 중 하나 -> 81개)
+        keys = ["".join(letters) for letters in itertools.product(*[(*pair, "?") for pair in DIMENSIONS])]
+        self._top = {}
+        for key in keys:
+            scores = bases[:]
+            for sign, column in zip(_signs(key), columns):
+                if sign:
+                    scores = [score + sign * weight for score, weight in zip(scores, column)]
+            for i, mbti_type in typed:
+                if mbti_type == key:
+                    scores[i] += TYPE_BONUS
+            # nlargest 는 점수가 같으면 앞쪽 항목(카탈로그 순서)을 먼저 고름
+            self._top[key] = heapq.nlargest(max_k, range(len(items)), key=scores.__getitem__)
+
+    def top(self, key, k=3):
+        """유형 또는 성향 조합(예: 'INTJ', 'IN', 'E?T?')에 맞는 상위 k 개 항목"""
+        key = key.upper().ljust(4, "?")
+        return [self.items[i] for i in self._top[key][:k]]
+
+
+_lock = threading.Lock()
+_loaded = {}  # 경로 -> (수정 시각, Catalog)
+
+
+def load_catalog(path):
+    with open(path, encoding="utf-8") as f:
+        return Catalog(json.load(f)["items"])
+
+
+def get_catalog(name):
+    """
+    이름으로 카탈로그를 가져옵니다. 프로세스마다 한 번 읽어 두고 파일이 바뀐 경우에만 다시 읽습니다.
+    """
+    path = os.path.join(CATALOG_DIR, f"{name}.json")
+    mtime = os.path.getmtime(path)
+    cached = _loaded.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with _lock:
+        cached = _loaded.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = _loaded[path] = (mtime, load_catalog(path))
+    return cached[1]
+
+
+def recommend(name, key, k=3):
+    """카탈로그 name 에서 유형/성향 조합 key 에 맞는 상위 k 개 항목"""
+    return get_catalog(name).top(key, k)